@@ -12,6 +12,7 @@ PASSWORD = "sigma"
 
 DBS = ["orders", "transactions", "products", "sellers"]
 THREADS = [10, 30, 50]   # SAFE for CouchDB on Windows
+DECODE_MODES = ["decoded", "orjson", "raw"]
 # ============================================================
 
 # --------------------------------
@@ -95,6 +96,32 @@ def add_to_cart():
     )
     return r.json()
 
+# --------------------------------
+# RESPONSE DECODING MODES
+# --------------------------------
+# decoded: r.json() into dicts (what every workload above does)
+# orjson:  same dicts from a faster parser
+# raw:     body bytes only, no parsing at all
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DECODERS = {
+    "decoded": lambda r: r.json(),
+    "raw": lambda r: r.content,
+}
+if orjson is not None:
+    DECODERS["orjson"] = lambda r: orjson.loads(r.content)
+
+def point_read_as(db, mode):
+    r = session.get(f"{COUCH_URL}/{db}/_all_docs?limit=1&include_docs=true")
+    return DECODERS[mode](r)
+
+def scan_read_as(db, mode, limit=300):
+    r = session.get(f"{COUCH_URL}/{db}/_all_docs?limit={limit}&include_docs=true")
+    return DECODERS[mode](r)
+
 # --------------------------------
 # SCALABILITY FUNCTIONS
 # --------------------------------
@@ -158,6 +185,30 @@ for db in DBS:
 
     print(f"  Completed CRUD + scalability for {db}")
 
+# --------------------------------
+# DECODED VS RAW RESPONSES
+# --------------------------------
+print("\nRunning decode-mode comparison...\n")
+
+for db in DBS:
+    for mode in DECODE_MODES:
+        if mode not in DECODERS:
+            print(f"  {mode} not available (pip install orjson), skipping")
+            continue
+        results.append(
+            ["CouchDB", db, f"Read throughput ({mode})", None,
+             throughput(lambda: point_read_as(db, mode))]
+        )
+        results.append(
+            ["CouchDB", db, f"Scan latency ({mode})",
+             measure(lambda: scan_read_as(db, mode)) * 1000, None]
+        )
+        results.append(
+            ["CouchDB", db, f"Scan throughput ({mode})", None,
+             throughput(lambda: scan_read_as(db, mode))]
+        )
+    print(f"  Completed decode modes for {db}")
+
 # --------------------------------
 # ADD-TO-CART METRICS
 # --------------------------------
@@ -1,8 +1,23 @@
+import argparse
 import csv
+import hashlib
 import json
 import os
+import sys
+import time
 import requests
 
+# orjson encodes the _bulk_docs payload several times faster than json;
+# the benchmark's "orjson" decode mode uses the same library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared batch autotuner lives in harness/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from harness.autotune import BatchTuner
+
 
 # ========================= CONFIG ============================
 COUCH_URL = "http://127.0.0.1:5984"
@@ -17,6 +32,9 @@ DATASETS = {
     "styles.csv": ("products", "id"),
     "olist_sellers_dataset.csv": ("sellers", "seller_id"),
 }
+
+KEYS_PER_REQUEST = 10000   # ids per _all_docs / view lookup in --sync mode
+REQUEST_TIMEOUT = 120      # seconds per _bulk_docs request
 # =============================================================
 
 
@@ -45,6 +63,19 @@ def try_convert(v):
     return v
 
 
+def encode_json(obj):
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def content_hash(doc):
+    # Canonical JSON of the CSV fields, so re-imports can spot changed rows
+    body = {k: v for k, v in doc.items() if k not in ("_id", "_rev", "content_hash")}
+    raw = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
 def load_csv_to_docs(path, id_field):
     docs = []
     with open(path, "r", encoding="utf-8-sig") as f:
@@ -54,35 +85,171 @@ def load_csv_to_docs(path, id_field):
             if id_field not in doc or doc[id_field] is None:
                 raise ValueError(f"Missing key '{id_field}' in row: {row}")
             doc["_id"] = str(doc[id_field])
+            doc["content_hash"] = content_hash(doc)
             docs.append(doc)
     print(f"Loaded {len(docs)} docs from {os.path.basename(path)}")
     return docs
 
 
-def bulk_insert(db, docs, batch_size=5000):
+def bulk_insert(db, docs, batch_size=None):
     url = f"{COUCH_URL}/{db}/_bulk_docs"
     
+    # batch_size=None: adapt it to the observed latency and payload size.
+    # Batches are sent one at a time here, so only the size is tuned.
+    tuner = (BatchTuner(label=db, max_inflight=1) if batch_size is None
+             else BatchTuner.fixed_size(batch_size, label=db))
     total = len(docs)
-    print(f"Inserting {total} documents into '{db}' in batches of {batch_size}...")
+    print(f"Inserting {total} documents into '{db}' "
+          + ("with autotuned batches..." if batch_size is None else f"in batches of {batch_size}..."))
+
+    docs = list(docs)  # timed-out batches drop the docs that already landed
+    written = conflicts = failed = 0
+    i = 0
+    while i < total:
+        chunk = docs[i:i+tuner.batch_size]
+        payload = encode_json({"docs": chunk})
+
+        start = time.time()
+        try:
+            r = requests.post(
+                url,
+                auth=(USERNAME, PASSWORD),
+                headers={"Content-Type": "application/json"},
+                data=payload,
+                timeout=REQUEST_TIMEOUT,
+            )
+        except requests.exceptions.Timeout:
+            r = None
+            # The batch may have been committed before the timeout: count what
+            # landed as written and resend only the rest, so a retry doesn't
+            # turn our own writes into conflicts
+            done = landed(db, chunk)
+            if done:
+                print(f"Batch {i}–{i+len(chunk)} timed out after {len(done)} docs landed")
+                written += len(done)
+                remaining = [doc for doc in chunk if doc["_id"] not in done]
+                docs[i:i+len(chunk)] = remaining
+                total = len(docs)
+                chunk = remaining
+            if not chunk:
+                if not tuner.fixed:
+                    tuner.failed()
+                continue
+
+        # Too slow or too large: shrink the batch and resend the same docs
+        if (r is None or r.status_code == 413) and not tuner.fixed and len(chunk) > 1:
+            tuner.failed()
+            print(f"Batch of {len(chunk)} timed out or too large, retrying with {tuner.batch_size}")
+            continue
+        if r is None or r.status_code not in (200, 201, 202):
+            print(f"ERROR inserting batch {i}–{i+len(chunk)}: "
+                  f"{'timeout' if r is None else r.text}")
+            return written, conflicts, failed
+        tuner.observe(len(chunk), len(payload), time.time() - start)
+
+        # _bulk_docs answers 201 even when some documents were rejected
+        errors = [res for res in r.json() if "error" in res]
+        batch_conflicts = sum(1 for res in errors if res["error"] == "conflict")
+        written += len(chunk) - len(errors)
+        conflicts += batch_conflicts
+        failed += len(errors) - batch_conflicts
+
+        print(f"Inserted batch {i}–{i+len(chunk)}"
+              + (f" ({len(errors)} rejected: {batch_conflicts} conflicts)" if errors else ""))
+        i += len(chunk)
+
+    print(f"Done: {written} written, {conflicts} conflicts, {failed} other errors")
+    print(f"Batch settings: {tuner.summary()}")
+    return written, conflicts, failed
 
-    for i in range(0, total, batch_size):
-        chunk = docs[i:i+batch_size]
-        payload = {"docs": chunk}
 
+def landed(db_name, chunk):
+    # New docs landed if they exist now; updates if the rev moved past the one sent
+    revs = fetch_revs(db_name, [doc["_id"] for doc in chunk])
+    return {doc["_id"] for doc in chunk
+            if doc["_id"] in revs and revs[doc["_id"]] != doc.get("_rev")}
+
+
+# --------------------------------
+# INCREMENTAL SYNC (--sync)
+# --------------------------------
+SYNC_DESIGN_DOC = {
+    "views": {
+        "content_hash": {
+            "map": "function (doc) { if (doc.content_hash) { emit(doc._id, doc.content_hash); } }"
+        }
+    }
+}
+
+
+def ensure_sync_view(db_name):
+    url = f"{COUCH_URL}/{db_name}/_design/sync"
+    r = requests.get(url, auth=(USERNAME, PASSWORD))
+    if r.status_code == 404:
+        r = requests.put(url, auth=(USERNAME, PASSWORD), json=SYNC_DESIGN_DOC)
+        if r.status_code not in (200, 201, 202):
+            raise RuntimeError(f"ERROR creating sync view on {db_name}: {r.text}")
+
+
+def lookup_keys(url, ids):
+    # POST {"keys": [...]} works for both _all_docs and views
+    rows = []
+    for i in range(0, len(ids), KEYS_PER_REQUEST):
         r = requests.post(
             url,
             auth=(USERNAME, PASSWORD),
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload),
+            json={"keys": ids[i:i+KEYS_PER_REQUEST]},
         )
-        
-        if r.status_code not in (200, 201, 202):
-            print(f"ERROR inserting batch {i}–{i+batch_size}: {r.text}")
-            return
-        
-        print(f"Inserted batch {i}–{i+len(chunk)}")
+        if r.status_code != 200:
+            raise RuntimeError(f"ERROR looking up keys at {url}: {r.text}")
+        rows.extend(r.json()["rows"])
+    return rows
 
 
+def fetch_revs(db_name, ids):
+    revs = {}
+    for row in lookup_keys(f"{COUCH_URL}/{db_name}/_all_docs", ids):
+        # Missing ids come back as {"key": ..., "error": "not_found"};
+        # deleted ones can be recreated without a rev
+        if "error" in row or row["value"].get("deleted"):
+            continue
+        revs[row["id"]] = row["value"]["rev"]
+    return revs
+
+
+def fetch_hashes(db_name, ids):
+    url = f"{COUCH_URL}/{db_name}/_design/sync/_view/content_hash"
+    return {row["id"]: row["value"] for row in lookup_keys(url, ids)}
+
+
+def sync_docs(db_name, docs, batch_size=None):
+    # The full import keeps the first row for a repeated key (later
+    # rows conflict), so the sync does the same
+    unique = {}
+    for doc in docs:
+        unique.setdefault(doc["_id"], doc)
+    duplicates = len(docs) - len(unique)
+
+    ids = list(unique)
+    ensure_sync_view(db_name)
+    revs = fetch_revs(db_name, ids)
+    hashes = fetch_hashes(db_name, ids)
+
+    to_send = []
+    new = changed = 0
+    for doc_id, doc in unique.items():
+        if doc_id not in revs:
+            new += 1
+            to_send.append(doc)
+        elif hashes.get(doc_id) != doc["content_hash"]:
+            changed += 1
+            to_send.append(dict(doc, _rev=revs[doc_id]))
+
+    print(f"Sync '{db_name}': {new} new, {changed} changed, "
+          f"{len(unique) - new - changed} unchanged, {duplicates} duplicate-key rows skipped")
+    if to_send:
+        bulk_insert(db_name, to_send, batch_size=batch_size)
+
 
 def create_index(db_name, field, index_name):
     url = f"{COUCH_URL}/{db_name}/_index"
@@ -103,6 +270,13 @@ def create_index(db_name, field, index_name):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Import the CSV datasets into CouchDB")
+    parser.add_argument("--sync", action="store_true",
+                        help="only send new or changed documents to existing databases")
+    parser.add_argument("--batch-size", type=int,
+                        help="fixed _bulk_docs batch size (default: autotuned)")
+    args = parser.parse_args()
+
     for filename, (db_name, key_field) in DATASETS.items():
         path = os.path.join(DATA_FOLDER, filename)
 
@@ -116,8 +290,11 @@ def main():
         # 2. Load CSV into documents
         docs = load_csv_to_docs(path, key_field)
 
-        # 3. Insert in bulk
-        bulk_insert(db_name, docs, batch_size=5000)
+        # 3. Insert in bulk (or only the differences)
+        if args.sync:
+            sync_docs(db_name, docs, batch_size=args.batch_size)
+        else:
+            bulk_insert(db_name, docs, batch_size=args.batch_size)
 
         # 4. Create index for benchmarking
         create_index(db_name, key_field, f"idx_{key_field}")
@@ -0,0 +1,113 @@
+from datetime import datetime
+
+# Aggregates over the E-Commerce Transactions dataset (data.csv), kept
+# identical across engines. All three read AGG_DATASET, which holds one
+# record per CSV line (key <InvoiceNo>-<row>): the "transactions"
+# dataset is keyed by invoice and keeps only one line of each.
+#   revenue_by_country        sum(Quantity * UnitPrice) per Country
+#   top_products_by_month     top TOP_N StockCodes by quantity, per YYYY-MM
+#   invoices_by_customer      distinct InvoiceNo per CustomerID, top TOP_N
+#
+# Redis keeps them up to date at write time (maintain_redis), MongoDB
+# computes them with aggregation pipelines, CouchDB with map/reduce
+# views (see harness/analytics.py).
+
+FIELDS = {
+    "invoice": "InvoiceNo",
+    "product": "StockCode",
+    "quantity": "Quantity",
+    "date": "InvoiceDate",
+    "price": "UnitPrice",
+    "customer": "CustomerID",
+    "country": "Country",
+}
+DATE_FORMATS = ["%m/%d/%Y %H:%M", "%Y-%m-%d %H:%M:%S"]
+TOP_N = 10
+AGG_PREFIX = "agg"
+AGG_DATASET = "transaction_lines"
+
+
+def month_of(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value), fmt).strftime("%Y-%m")
+        except ValueError:
+            pass
+    return None
+
+
+def number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# --------------------------------
+# REDIS COUNTERS (WRITE TIME)
+# --------------------------------
+# One Lua script per transaction line, so the updates stay one pipelined
+# round trip and are idempotent: the line key is added to an "applied"
+# set first and nothing is counted if it was already there. A batch
+# replayed after a resume or a split retry therefore changes nothing.
+# Distinct invoices per customer need the same check-and-increment on
+# the invoice number. The reply is the number of commands the script
+# ran, i.e. the write amplification of that line.
+#   KEYS  applied, revenue, months, top_products:<month>, seen, customers
+#   ARGV  line key, country, revenue, month, product, quantity, invoice, customer
+# An empty ARGV means the field was missing and that counter is skipped.
+UPDATE_LUA = """
+if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+    return 1
+end
+local n = 1
+if ARGV[2] ~= '' then
+    redis.call('HINCRBYFLOAT', KEYS[2], ARGV[2], ARGV[3])
+    n = n + 1
+end
+if ARGV[4] ~= '' then
+    redis.call('SADD', KEYS[3], ARGV[4])
+    redis.call('ZINCRBY', KEYS[4], ARGV[6], ARGV[5])
+    n = n + 2
+end
+if ARGV[8] ~= '' then
+    n = n + 1
+    if redis.call('SADD', KEYS[5], ARGV[7]) == 1 then
+        redis.call('ZINCRBY', KEYS[6], 1, ARGV[8])
+        n = n + 1
+    end
+end
+return n
+"""
+
+
+def redis_keys(prefix=AGG_PREFIX):
+    return {
+        "revenue": f"{prefix}:revenue_by_country",
+        "months": f"{prefix}:months",
+        "products": f"{prefix}:top_products:",       # + YYYY-MM
+        "applied": f"{prefix}:applied_lines",
+        "seen": f"{prefix}:seen_invoices",
+        "customers": f"{prefix}:invoices_by_customer",
+    }
+
+
+def maintain_redis(pipe, key, record, prefix=AGG_PREFIX):
+    # Queues the counter updates for one transaction line (key is its
+    # per-line key) on pipe; its reply is the number of commands run.
+    keys = redis_keys(prefix)
+    country = record.get(FIELDS["country"])
+    quantity = number(record.get(FIELDS["quantity"]))
+    revenue = quantity * number(record.get(FIELDS["price"]))
+    month = month_of(record.get(FIELDS["date"]))
+    product = record.get(FIELDS["product"])
+    if product is None:
+        month = None
+    customer = record.get(FIELDS["customer"])
+    invoice = record.get(FIELDS["invoice"])
+    if invoice is None:
+        customer = None
+    pipe.eval(UPDATE_LUA, 6, keys["applied"], keys["revenue"], keys["months"],
+              keys["products"] + (month or ""), keys["seen"], keys["customers"],
+              key, "" if country is None else str(country), revenue, month or "",
+              str(product), quantity, str(invoice), "" if customer is None else str(customer))
@@ -0,0 +1,401 @@
+import argparse
+import itertools
+import math
+import os
+import time
+
+from harness.aggregates import (
+    AGG_DATASET, AGG_PREFIX, FIELDS, TOP_N, maintain_redis, redis_keys,
+)
+from harness.backends import BACKENDS
+from harness.config import BENCH_TAG_FIELD, COUCH_URL, DATA_FOLDER, DATASETS
+from harness.records import iter_csv_records
+from harness.stats import latency_rows, save_results, summarize
+
+# Analytical queries on the transaction lines, one implementation per
+# engine (definitions in harness/aggregates.py). Load the line-keyed
+# dataset first on every engine:
+#   python -m harness.load_coordinator --engine mongodb --dataset transaction_lines
+#
+#   MongoDB  aggregation pipelines, computed at query time
+#   CouchDB  map/reduce views in _design/analytics; the index build and
+#            the incremental update after new writes are timed
+#   Redis    hash / sorted-set counters maintained at write time, either
+#            while loading (load_coordinator --aggregates) or by
+#            --backfill-redis from the CSV
+#
+#   python -m harness.analytics --backfill-redis --rebuild-views
+#
+# The top TOP_N of every aggregate is compared across the engines run.
+#
+# Write amplification is measured on --sample scratch records (tagged
+# and removed afterwards): per-write latency and commands with and
+# without keeping the aggregates current.
+
+AGGREGATES = ["revenue_by_country", "top_products_by_month", "invoices_by_customer"]
+
+
+# --------------------------------
+# MONGODB: AGGREGATION PIPELINES
+# --------------------------------
+F = {name: f"${field}" for name, field in FIELDS.items()}
+
+# "12/1/2010 8:26" -> "2010-12"; ISO dates keep their first 7 chars
+_parts = {"$split": [F["date"], "/"]}
+MONTH_EXPR = {"$cond": [
+    {"$gte": [{"$indexOfBytes": [F["date"], "/"]}, 0]},
+    {"$let": {"vars": {"p": _parts}, "in": {"$concat": [
+        {"$substrBytes": [{"$arrayElemAt": ["$$p", 2]}, 0, 4]}, "-",
+        {"$cond": [{"$eq": [{"$strLenBytes": {"$arrayElemAt": ["$$p", 0]}}, 1]},
+                   {"$concat": ["0", {"$arrayElemAt": ["$$p", 0]}]},
+                   {"$arrayElemAt": ["$$p", 0]}]},
+    ]}}},
+    {"$substrBytes": [F["date"], 0, 7]},
+]}
+
+PIPELINES = {
+    "revenue_by_country": [
+        {"$match": {FIELDS["country"]: {"$ne": None}}},
+        {"$group": {"_id": F["country"],
+                    "revenue": {"$sum": {"$multiply": [F["quantity"], F["price"]]}}}},
+        {"$sort": {"revenue": -1}},
+    ],
+    "top_products_by_month": [
+        {"$match": {FIELDS["date"]: {"$type": "string"}}},
+        {"$group": {"_id": {"month": MONTH_EXPR, "product": F["product"]},
+                    "qty": {"$sum": F["quantity"]}}},
+        {"$sort": {"qty": -1}},
+        {"$group": {"_id": "$_id.month",
+                    "top": {"$push": {"product": "$_id.product", "qty": "$qty"}}}},
+        {"$project": {"top": {"$slice": ["$top", TOP_N]}}},
+        {"$sort": {"_id": 1}},
+    ],
+    "invoices_by_customer": [
+        {"$match": {FIELDS["customer"]: {"$ne": None}}},
+        {"$group": {"_id": {"c": F["customer"], "i": F["invoice"]}}},
+        {"$group": {"_id": "$_id.c", "invoices": {"$sum": 1}}},
+        {"$sort": {"invoices": -1}},
+        {"$limit": TOP_N},
+    ],
+}
+
+
+def mongo_query(backend, name):
+    return list(backend.db[AGG_DATASET].aggregate(PIPELINES[name], allowDiskUse=True))
+
+
+# --------------------------------
+# COUCHDB: MAP/REDUCE VIEWS
+# --------------------------------
+_MONTH_JS = (
+    "function month(s) { if (typeof s !== 'string') return null;"
+    " var m = s.match(/^(\\d{4})-(\\d{2})/); if (m) return m[1] + '-' + m[2];"
+    " m = s.match(/^(\\d{1,2})\\/\\d{1,2}\\/(\\d{4})/);"
+    " if (m) return m[2] + '-' + (m[1].length < 2 ? '0' : '') + m[1]; return null; }"
+)
+
+
+def _doc(field):
+    return f"doc[{FIELDS[field]!r}]"
+
+
+ANALYTICS_DDOC = {
+    "views": {
+        "revenue_by_country": {
+            "map": f"function (doc) {{ if ({_doc('country')} != null) {{"
+                   f" emit({_doc('country')}, ({_doc('quantity')} || 0) * ({_doc('price')} || 0)); }} }}",
+            "reduce": "_sum",
+        },
+        "product_qty_by_month": {
+            "map": f"function (doc) {{ {_MONTH_JS} var m = month({_doc('date')});"
+                   f" if (m && {_doc('product')} != null) {{"
+                   f" emit([m, {_doc('product')}], {_doc('quantity')} || 0); }} }}",
+            "reduce": "_sum",
+        },
+        "invoices_by_customer": {
+            "map": f"function (doc) {{ if ({_doc('customer')} != null) {{"
+                   f" emit([{_doc('customer')}, {_doc('invoice')}], null); }} }}",
+            "reduce": "_count",
+        },
+    }
+}
+DDOC_URL = f"{COUCH_URL}/{AGG_DATASET}/_design/analytics"
+
+
+def couch_view(backend, view, **params):
+    r = backend.session.get(f"{DDOC_URL}/_view/{view}", params=params)
+    if r.status_code != 200:
+        raise RuntimeError(f"view {view}: {r.text}")
+    return r.json()["rows"]
+
+
+def couch_query(backend, name):
+    # Views can't sort by value, so ranking happens client-side
+    if name == "revenue_by_country":
+        rows = couch_view(backend, "revenue_by_country", group="true")
+        return sorted(rows, key=lambda r: -r["value"])
+    if name == "top_products_by_month":
+        top = {}
+        for row in couch_view(backend, "product_qty_by_month", group_level=2):
+            top.setdefault(row["key"][0], []).append((row["value"], row["key"][1]))
+        return {m: sorted(v, reverse=True)[:TOP_N] for m, v in top.items()}
+    # One row per distinct (customer, invoice) pair
+    rows = couch_view(backend, "invoices_by_customer", group_level=2)
+    counts = [(len(list(g)), c) for c, g in itertools.groupby(rows, key=lambda r: r["key"][0])]
+    return sorted(counts, reverse=True)[:TOP_N]
+
+
+def couch_build_views(backend, rebuild):
+    # Returns the full index build time in ms (None if the views already existed)
+    existing = backend.session.get(DDOC_URL)
+    if existing.status_code == 200 and not rebuild:
+        return None
+    if existing.status_code == 200:
+        backend.session.delete(DDOC_URL, params={"rev": existing.json()["_rev"]})
+    backend.session.put(DDOC_URL, json=ANALYTICS_DDOC)
+    # All views in a design doc share one index, built by the first query
+    start = time.perf_counter()
+    couch_view(backend, "revenue_by_country", limit=0)
+    return (time.perf_counter() - start) * 1000
+
+
+# --------------------------------
+# REDIS: PRE-COMPUTED COUNTERS
+# --------------------------------
+def redis_query(backend, name, prefix=AGG_PREFIX):
+    r = backend.r
+    keys = redis_keys(prefix)
+    if name == "revenue_by_country":
+        revenue = r.hgetall(keys["revenue"])
+        return sorted(((float(v), k) for k, v in revenue.items()), reverse=True)
+    if name == "top_products_by_month":
+        months = sorted(r.smembers(keys["months"]))
+        pipe = r.pipeline(transaction=False)
+        for m in months:
+            pipe.zrevrange(keys["products"] + m, 0, TOP_N - 1, withscores=True)
+        return dict(zip(months, pipe.execute()))
+    return r.zrevrange(keys["customers"], 0, TOP_N - 1, withscores=True)
+
+
+def delete_redis_aggregates(r, prefix):
+    keys = list(r.scan_iter(match=f"{prefix}:*", count=1000))
+    for i in range(0, len(keys), 1000):
+        r.delete(*keys[i:i + 1000])
+
+
+def backfill_redis(backend, path):
+    delete_redis_aggregates(backend.r, AGG_PREFIX)
+    start = time.time()
+    pipe = backend.r.pipeline(transaction=False)
+    rows = 0
+    # Same per-line keys as the loader, so the applied set matches
+    for key, record in iter_csv_records(path, FIELDS["invoice"], per_line=True):
+        maintain_redis(pipe, key, record)
+        rows += 1
+        if len(pipe) >= 5000:
+            pipe.execute()
+    pipe.execute()
+    print(f"  Backfilled Redis aggregates from {rows} rows in {time.time() - start:.1f}s")
+
+
+# --------------------------------
+# WRITE AMPLIFICATION
+# --------------------------------
+def timed(func):
+    t0 = time.perf_counter()
+    func()
+    return (time.perf_counter() - t0) * 1000
+
+
+def redis_write_cost(backend, sample, run_id):
+    r = backend.r
+    scratch = f"{AGG_PREFIX}:{run_id}"
+    plain, with_agg, ops = [], [], 0
+
+    for i, (_, record) in enumerate(sample):
+        key = f"{DATASETS[AGG_DATASET][2]}:{run_id}-{i}"
+        data = {k: str(v) for k, v in record.items() if v is not None}
+        plain.append(timed(lambda: r.hset(key + "-plain", mapping=data)))
+
+        pipe = r.pipeline(transaction=False)
+        pipe.hset(key, mapping=data)
+        maintain_redis(pipe, f"{run_id}-{i}", record, prefix=scratch)
+        t0 = time.perf_counter()
+        replies = pipe.execute()
+        with_agg.append((time.perf_counter() - t0) * 1000)
+        # The script replies with the commands it actually ran
+        ops += 1 + replies[-1]
+
+    backend.delete_tagged(AGG_DATASET, run_id)
+    delete_redis_aggregates(r, scratch)
+    return plain, with_agg, ops / len(sample)
+
+
+def mongo_write_cost(backend, sample, run_id):
+    lat = [timed(lambda i=i, rec=rec: backend.insert(
+               AGG_DATASET, f"{run_id}-{i}", dict(rec, **{BENCH_TAG_FIELD: run_id})))
+           for i, (_, rec) in enumerate(sample)]
+    backend.delete_tagged(AGG_DATASET, run_id)
+    # Nothing to maintain: the pipelines pay at query time
+    return lat, lat, 1.0
+
+
+def couch_write_cost(backend, sample, run_id):
+    lat = [timed(lambda i=i, rec=rec: backend.insert(
+               AGG_DATASET, f"{run_id}-{i}", dict(rec, **{BENCH_TAG_FIELD: run_id})))
+           for i, (_, rec) in enumerate(sample)]
+    # The views catch up on the next read; that read pays for the
+    # new documents on top of a normal (up to date) query
+    fresh = timed(lambda: couch_view(backend, "revenue_by_country", limit=0))
+    backend.delete_tagged(AGG_DATASET, run_id)
+    couch_view(backend, "revenue_by_country", limit=0)
+    baseline = timed(lambda: couch_view(backend, "revenue_by_country", limit=0))
+    per_doc = max(0.0, fresh - baseline) / len(sample)
+    return lat, lat, per_doc
+
+
+# --------------------------------
+# CROSS-ENGINE CHECK
+# --------------------------------
+def _member(value):
+    # 17850, 17850.0 and "17850" are the same customer
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return str(int(f)) if f.is_integer() else str(value)
+
+
+def top_n(engine, name, result):
+    # Query result -> {group: [(member, value), ...]} for the TOP_N largest
+    if name == "revenue_by_country":
+        if engine == "mongodb":
+            groups = {"": [(d["_id"], d["revenue"]) for d in result]}
+        elif engine == "couchdb":
+            groups = {"": [(row["key"], row["value"]) for row in result]}
+        else:
+            groups = {"": [(k, v) for v, k in result]}
+    elif name == "top_products_by_month":
+        if engine == "mongodb":
+            groups = {d["_id"]: [(p["product"], p["qty"]) for p in d["top"]] for d in result}
+        elif engine == "couchdb":
+            groups = {m: [(p, q) for q, p in top] for m, top in result.items()}
+        else:
+            groups = result
+    else:
+        if engine == "mongodb":
+            groups = {"": [(d["_id"], d["invoices"]) for d in result]}
+        elif engine == "couchdb":
+            groups = {"": [(c, n) for n, c in result]}
+        else:
+            groups = {"": result}
+    return {g: sorted(((_member(k), float(v)) for k, v in pairs), key=lambda p: -p[1])[:TOP_N]
+            for g, pairs in groups.items()}
+
+
+def same_top(a, b):
+    # Values must agree rank by rank; members only above the N-th value,
+    # since ties at the cut-off can be broken either way
+    close = lambda x, y: math.isclose(x, y, rel_tol=1e-6, abs_tol=1e-6)
+    if a.keys() != b.keys():
+        return False
+    for group, x in a.items():
+        y = b[group]
+        if len(x) != len(y) or not all(close(v, w) for (_, v), (_, w) in zip(x, y)):
+            return False
+        cut = x[-1][1] if x else 0
+        if {k for k, v in x if not close(v, cut)} != {k for k, v in y if not close(v, cut)}:
+            return False
+    return True
+
+
+# --------------------------------
+# MAIN
+# --------------------------------
+QUERIES = {
+    "mongodb": mongo_query,
+    "couchdb": couch_query,
+    "redis": redis_query,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytical aggregation workloads")
+    parser.add_argument("--engine", choices=sorted(QUERIES), action="append",
+                        help="repeatable; defaults to all engines")
+    parser.add_argument("--runs", type=int, default=10, help="query repetitions")
+    parser.add_argument("--sample", type=int, default=1000,
+                        help="scratch records for the write-amplification test")
+    parser.add_argument("--rebuild-views", action="store_true",
+                        help="drop and rebuild the CouchDB views to time a full index build")
+    parser.add_argument("--backfill-redis", action="store_true",
+                        help="rebuild the Redis counters from the transactions CSV")
+    parser.add_argument("--data-folder", default=DATA_FOLDER)
+    parser.add_argument("--output", default="analytics_metrics.csv")
+    args = parser.parse_args()
+
+    path = os.path.join(args.data_folder, DATASETS[AGG_DATASET][0])
+    sample = list(itertools.islice(iter_csv_records(path, FIELDS["invoice"]), args.sample))
+    run_id = f"analytics-{int(time.time())}"
+    results = []
+    outputs, names = {}, {}
+
+    print("\nRunning analytical aggregation workloads...\n")
+    for engine in args.engine or ["mongodb", "couchdb", "redis"]:
+        backend = BACKENDS[engine]()
+        print(f"{backend.name}")
+
+        if engine == "couchdb":
+            build_ms = couch_build_views(backend, args.rebuild_views)
+            if build_ms is not None:
+                print(f"  View index build: {build_ms / 1000:.1f}s")
+                results.append([backend.name, AGG_DATASET, "View index build time", build_ms, None])
+        if engine == "redis" and args.backfill_redis:
+            backfill_redis(backend, path)
+
+        names[engine] = backend.name
+        outputs[engine] = {name: QUERIES[engine](backend, name) for name in AGGREGATES}
+        for name in AGGREGATES:
+            lat = [timed(lambda: QUERIES[engine](backend, name)) for _ in range(args.runs)]
+            s = summarize(lat)
+            print(f"  {name:<24} mean {s['mean']:10.2f} ms  p95 {s['p95']:10.2f} ms")
+            results += latency_rows(backend.name, AGG_DATASET, f"{name} query", lat)
+
+        if sample:
+            cost = {"redis": redis_write_cost, "mongodb": mongo_write_cost,
+                    "couchdb": couch_write_cost}[engine]
+            plain, with_agg, extra = cost(backend, sample, run_id)
+            results += [
+                [backend.name, AGG_DATASET, "Write latency (plain)", summarize(plain)["mean"], None],
+                [backend.name, AGG_DATASET, "Write latency (aggregates maintained)",
+                 summarize(with_agg)["mean"], None],
+            ]
+            if engine == "couchdb":
+                print(f"  View update cost: {extra:.3f} ms per new document")
+                results.append([backend.name, AGG_DATASET, "View update cost per doc", extra, None])
+            else:
+                print(f"  Write amplification: {extra:.2f} commands per record, "
+                      f"{summarize(plain)['mean']:.3f} -> {summarize(with_agg)['mean']:.3f} ms")
+                results.append([backend.name, AGG_DATASET,
+                                "Write amplification (ops/record)", extra, None])
+        print()
+
+    engines = list(outputs)
+    if len(engines) > 1:
+        print(f"Cross-engine check (top {TOP_N}):")
+        ref = engines[0]
+        for name in AGGREGATES:
+            expected = top_n(ref, name, outputs[ref][name])
+            for engine in engines[1:]:
+                match = same_top(expected, top_n(engine, name, outputs[engine][name]))
+                print(f"  {name:<24} {names[ref]} vs {names[engine]}: "
+                      f"{'match' if match else 'MISMATCH'}")
+                results.append([f"{names[ref]} vs {names[engine]}", AGG_DATASET,
+                                f"{name} top {TOP_N} match", int(match), None])
+        print()
+
+    save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import threading
+import time
+
+# Adaptive batch size / in-flight batch count for bulk writes
+# (CouchDB _bulk_docs, Redis pipelines, MongoDB insert_many).
+#
+# Hill climbing on measured docs/sec, one dimension at a time:
+#   1. batch size doubles while each step raises throughput by at least
+#      MIN_GAIN and a batch stays under the latency and payload limits;
+#   2. then the number of in-flight batches grows by one the same way;
+#   3. the best setting seen is kept ("converged").
+# A failed batch (timeout, request too large, ...) halves the batch
+# size and drops one in-flight slot; the failed batch is retried in
+# halves by split_write().
+#
+#   tuner = BatchTuner(label="couchdb/orders")
+#   ... write tuner.batch_size docs, at most tuner.inflight at a time ...
+#   tuner.observe(n_docs, n_bytes, seconds)
+#   print(tuner.summary())
+
+MIN_GAIN = 0.05
+
+
+class BatchTuner:
+    def __init__(self, label="", batch_size=500, inflight=1, min_batch=50,
+                 max_batch=100000, max_inflight=8, max_bytes=16 * 1024 ** 2,
+                 latency_limit=5.0, window=3, fixed=False):
+        self.label = label
+        self.batch_size = batch_size
+        self.inflight = inflight
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.max_inflight = max_inflight
+        self.max_bytes = max_bytes
+        self.latency_limit = latency_limit
+        self.window = window
+        self.fixed = fixed
+
+        self.phase = "converged" if fixed else "batch"
+        self.bytes_per_doc = None
+        self.best = None                     # (docs/sec, batch_size, inflight)
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._reset_window()
+
+    @classmethod
+    def fixed_size(cls, batch_size, label=""):
+        # Same interface, never changes: used when a batch size is given
+        return cls(label=label, batch_size=batch_size, min_batch=1, fixed=True)
+
+    def _reset_window(self):
+        self._window_start = time.time()
+        self._window_docs = 0
+        self._window_batches = 0
+        self._window_slow = False
+
+    # ---- limits ----
+    def _byte_cap(self):
+        if not self.bytes_per_doc:
+            return self.max_batch
+        return max(self.min_batch, int(self.max_bytes / self.bytes_per_doc))
+
+    def _clamp(self, n):
+        return max(self.min_batch, min(n, self.max_batch, self._byte_cap()))
+
+    # ---- feedback ----
+    def observe(self, n_docs, n_bytes, seconds):
+        with self._lock:
+            if n_docs:
+                per_doc = n_bytes / n_docs
+                self.bytes_per_doc = (per_doc if self.bytes_per_doc is None
+                                      else 0.8 * self.bytes_per_doc + 0.2 * per_doc)
+            if self.fixed:
+                return
+            self._window_docs += n_docs
+            self._window_batches += 1
+            self._window_slow |= seconds > self.latency_limit
+            if self._window_batches >= self.window * self.inflight:
+                self._step()
+
+    def failed(self):
+        with self._lock:
+            self.failures += 1
+            if self.fixed:
+                return
+            self.batch_size = self._clamp(self.batch_size // 2)
+            self.inflight = max(1, self.inflight - 1)
+            self.phase = "converged"
+            self.best = None
+            self._reset_window()
+
+    def _step(self):
+        elapsed = time.time() - self._window_start
+        rate = self._window_docs / elapsed if elapsed > 0 else 0.0
+        slow = self._window_slow
+        self._reset_window()
+
+        improved = self.best is None or rate > self.best[0] * (1 + MIN_GAIN)
+        if self.best is None or (not slow and rate > self.best[0]):
+            self.best = (rate, self.batch_size, self.inflight)
+        climb = improved and not slow
+
+        if self.phase == "batch":
+            grown = self._clamp(self.batch_size * 2)
+            if climb and grown > self.batch_size:
+                self.batch_size = grown
+                return
+            _, self.batch_size, self.inflight = self.best
+            self.phase = "inflight"
+            if self.inflight < self.max_inflight:
+                self.inflight += 1
+                return
+        elif self.phase == "inflight":
+            if climb and self.inflight < self.max_inflight:
+                self.inflight += 1
+                return
+            _, self.batch_size, self.inflight = self.best
+        self.phase = "converged"
+        # The payload cap still applies if documents get bigger
+        self.batch_size = self._clamp(self.batch_size)
+
+    # ---- reporting ----
+    def summary(self):
+        peak = f"{self.best[0]:.0f} docs/s" if self.best else "n/a"
+        per_doc = f"{self.bytes_per_doc:.0f} B/doc" if self.bytes_per_doc else "n/a"
+        mode = "fixed" if self.fixed else self.phase
+        return (f"{self.label}: batch_size={self.batch_size} inflight={self.inflight} "
+                f"({mode}, peak {peak}, {per_doc}, {self.failures} failed batches)")
+
+
+def split_write(write, batch, tuner):
+    # write(batch) -> (existing, payload bytes). On failure, report to the
+    # tuner and retry the batch in halves; a single record that still
+    # fails is a real error and is raised.
+    try:
+        return write(batch)
+    except Exception:
+        if len(batch) <= 1:
+            raise
+        tuner.failed()
+        mid = len(batch) // 2
+        e1, b1 = split_write(write, batch[:mid], tuner)
+        e2, b2 = split_write(write, batch[mid:], tuner)
+        return e1 + e2, b1 + b2
@@ -0,0 +1,278 @@
+import json
+import threading
+
+import requests
+
+from harness.config import (
+    COUCH_URL, COUCH_USER, COUCH_PASSWORD, REDIS_HOST, REDIS_PORT,
+    MONGO_URI, MONGO_DB, DATASETS, WORKLOAD_PREFIXES, BENCH_TAG_FIELD,
+)
+
+
+# --------------------------------
+# UNIFORM PER-ENGINE ACCESS
+# --------------------------------
+# The composite workloads (cache-aside, checkout, ...) need the same
+# few primitives on every engine: list some ids, fetch records by id,
+# bump a numeric field (creating the record if needed), insert and
+# delete. Record ids are the engine's own primary key (_id for the
+# document stores, the part after "<prefix>:" for Redis).
+#
+# Records a benchmark creates get an id starting with "<run id>-" and
+# BENCH_TAG_FIELD set to the run id, so delete_tagged() can roll a run
+# back on every engine (Redis has no secondary lookup, so it matches
+# the key pattern instead).
+class MongoBackend:
+    name = "MongoDB"
+
+    def __init__(self):
+        import pymongo
+
+        self.db = pymongo.MongoClient(MONGO_URI)[MONGO_DB]
+
+    def sample_ids(self, dataset, n):
+        return [d["_id"] for d in self.db[dataset].find({}, {"_id": 1}).limit(n)]
+
+    def get(self, dataset, doc_id):
+        return self.db[dataset].find_one({"_id": doc_id})
+
+    def get_many(self, dataset, doc_ids):
+        return list(self.db[dataset].find({"_id": {"$in": list(doc_ids)}}))
+
+    def scan(self, dataset, limit):
+        return list(self.db[dataset].find().limit(limit))
+
+    def incr(self, dataset, doc_id, field, amount=1):
+        self.db[dataset].update_one({"_id": doc_id}, {"$inc": {field: amount}}, upsert=True)
+
+    def insert(self, dataset, doc_id, doc):
+        self.db[dataset].insert_one(dict(doc, _id=doc_id))
+
+    def delete(self, dataset, doc_id):
+        self.db[dataset].delete_one({"_id": doc_id})
+
+    def restore(self, dataset, doc_id, doc):
+        # doc is a snapshot from get(); None means the record didn't exist
+        if doc is None:
+            self.delete(dataset, doc_id)
+        else:
+            self.db[dataset].replace_one({"_id": doc_id}, doc, upsert=True)
+
+    def delete_tagged(self, dataset, run_id):
+        return self.db[dataset].delete_many({BENCH_TAG_FIELD: run_id}).deleted_count
+
+    def has_data(self, dataset):
+        return self.db[dataset].find_one({}, {"_id": 1}) is not None
+
+    def ensure_db(self, dataset):
+        pass  # collections are created on first write
+
+
+class CouchBackend:
+    name = "CouchDB"
+    max_retries = 20
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.auth = (COUCH_USER, COUCH_PASSWORD)
+        # Pool sized for the thread counts the benchmarks use
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=256)
+        self.session.mount("http://", adapter)
+        self.conflicts = 0
+        self._lock = threading.Lock()
+        self._tag_indexed = set()
+
+    def sample_ids(self, dataset, n):
+        r = self.session.get(f"{COUCH_URL}/{dataset}/_all_docs", params={"limit": n})
+        return [row["id"] for row in r.json()["rows"] if not row["id"].startswith("_design/")]
+
+    def get(self, dataset, doc_id):
+        r = self.session.get(f"{COUCH_URL}/{dataset}/{doc_id}")
+        return r.json() if r.status_code == 200 else None
+
+    def get_many(self, dataset, doc_ids):
+        r = self.session.post(f"{COUCH_URL}/{dataset}/_all_docs",
+                              params={"include_docs": "true"}, json={"keys": list(doc_ids)})
+        return [row["doc"] for row in r.json()["rows"] if row.get("doc")]
+
+    def scan(self, dataset, limit):
+        r = self.session.get(f"{COUCH_URL}/{dataset}/_all_docs",
+                             params={"limit": limit, "include_docs": "true"})
+        return [row["doc"] for row in r.json()["rows"]]
+
+    def incr(self, dataset, doc_id, field, amount=1):
+        # No server-side increment: read-modify-write, retried on conflict
+        for _ in range(self.max_retries):
+            doc = self.get(dataset, doc_id) or {}
+            doc[field] = (doc.get(field) or 0) + amount
+            r = self.session.put(f"{COUCH_URL}/{dataset}/{doc_id}", json=doc)
+            if r.status_code in (201, 202):
+                return
+            if r.status_code != 409:
+                raise RuntimeError(f"incr {dataset}/{doc_id}: {r.status_code} {r.text}")
+            with self._lock:
+                self.conflicts += 1
+        raise RuntimeError(f"gave up on {dataset}/{doc_id} after {self.max_retries} conflicts")
+
+    def insert(self, dataset, doc_id, doc):
+        r = self.session.put(f"{COUCH_URL}/{dataset}/{doc_id}", json=doc)
+        if r.status_code not in (201, 202):
+            raise RuntimeError(f"insert {dataset}/{doc_id}: {r.text}")
+
+    def delete(self, dataset, doc_id):
+        doc = self.get(dataset, doc_id)
+        if doc:
+            r = self.session.delete(f"{COUCH_URL}/{dataset}/{doc_id}", params={"rev": doc["_rev"]})
+            if r.status_code not in (200, 202, 404):
+                raise RuntimeError(f"delete {dataset}/{doc_id}: {r.status_code} {r.text}")
+
+    def restore(self, dataset, doc_id, doc):
+        # Write the snapshot back on top of whatever revision is current,
+        # re-reading the rev if a concurrent writer got there first
+        if doc is None:
+            self.delete(dataset, doc_id)
+            return
+        body = {k: v for k, v in doc.items() if k != "_rev"}
+        for _ in range(self.max_retries):
+            current = self.get(dataset, doc_id)
+            if current:
+                body["_rev"] = current["_rev"]
+            r = self.session.put(f"{COUCH_URL}/{dataset}/{doc_id}", json=body)
+            if r.status_code in (201, 202):
+                return
+            if r.status_code != 409:
+                raise RuntimeError(f"restore {dataset}/{doc_id}: {r.status_code} {r.text}")
+        raise RuntimeError(f"gave up restoring {dataset}/{doc_id} after {self.max_retries} conflicts")
+
+    def delete_tagged(self, dataset, run_id):
+        if dataset not in self._tag_indexed:
+            # Partial by nature: a json index only holds docs that have the field
+            self.session.post(f"{COUCH_URL}/{dataset}/_index", json={
+                "index": {"fields": [BENCH_TAG_FIELD]}, "name": f"idx_{BENCH_TAG_FIELD}",
+            })
+            self._tag_indexed.add(dataset)
+        deleted = 0
+        while True:
+            r = self.session.post(f"{COUCH_URL}/{dataset}/_find", json={
+                "selector": {BENCH_TAG_FIELD: run_id},
+                "fields": ["_id", "_rev"],
+                "limit": 5000,
+            })
+            if r.status_code != 200:
+                raise RuntimeError(f"finding {run_id} docs in {dataset}: {r.status_code} {r.text}")
+            docs = r.json().get("docs", [])
+            if not docs:
+                return deleted
+            for doc in docs:
+                doc["_deleted"] = True
+            r = self.session.post(f"{COUCH_URL}/{dataset}/_bulk_docs", json={"docs": docs})
+            if r.status_code not in (201, 202):
+                raise RuntimeError(f"deleting {run_id} docs in {dataset}: {r.status_code} {r.text}")
+            # Conflicted docs come back from the next _find with their new
+            # rev; anything else, or a round that deletes nothing, is fatal
+            # rather than looping on the same docs forever
+            results = r.json()
+            ok = sum(1 for res in results if "error" not in res)
+            other = [res for res in results if res.get("error") not in (None, "conflict")]
+            if other or not ok:
+                res = (other or results)[0]
+                raise RuntimeError(f"deleting {run_id} docs in {dataset}: {len(docs) - ok} rejected "
+                                   f"({res.get('id')}: {res.get('error')} {res.get('reason')})")
+            deleted += ok
+
+    def has_data(self, dataset):
+        r = self.session.get(f"{COUCH_URL}/{dataset}")
+        return r.status_code == 200 and r.json().get("doc_count", 0) > 0
+
+    def ensure_db(self, dataset):
+        self.session.put(f"{COUCH_URL}/{dataset}")
+
+
+class RedisBackend:
+    name = "Redis"
+
+    def __init__(self, client=None):
+        import redis
+
+        self.r = client or redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+
+    def _prefix(self, dataset):
+        if dataset in DATASETS:
+            return DATASETS[dataset][2]
+        return WORKLOAD_PREFIXES[dataset]
+
+    def _key(self, dataset, record_id):
+        return f"{self._prefix(dataset)}:{record_id}"
+
+    def sample_ids(self, dataset, n):
+        prefix = self._prefix(dataset) + ":"
+        ids = []
+        for key in self.r.scan_iter(match=prefix + "*", count=1000):
+            ids.append(key[len(prefix):])
+            if len(ids) >= n:
+                break
+        return ids
+
+    def get(self, dataset, record_id):
+        return self.r.hgetall(self._key(dataset, record_id)) or None
+
+    def get_many(self, dataset, record_ids):
+        pipe = self.r.pipeline(transaction=False)
+        for record_id in record_ids:
+            pipe.hgetall(self._key(dataset, record_id))
+        return [h for h in pipe.execute() if h]
+
+    def scan(self, dataset, limit):
+        keys = []
+        for key in self.r.scan_iter(match=self._prefix(dataset) + ":*", count=1000):
+            keys.append(key)
+            if len(keys) >= limit:
+                break
+        pipe = self.r.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        return pipe.execute()
+
+    def incr(self, dataset, record_id, field, amount=1):
+        self.r.hincrby(self._key(dataset, record_id), field, amount)
+
+    def insert(self, dataset, record_id, record):
+        # Hash fields are flat strings; nested values are stored as JSON
+        data = {k: v if isinstance(v, str) else json.dumps(v)
+                for k, v in record.items() if v is not None}
+        self.r.hset(self._key(dataset, record_id), mapping=data)
+
+    def delete(self, dataset, record_id):
+        self.r.delete(self._key(dataset, record_id))
+
+    def restore(self, dataset, record_id, record):
+        key = self._key(dataset, record_id)
+        pipe = self.r.pipeline()
+        pipe.delete(key)
+        if record:
+            pipe.hset(key, mapping=record)
+        pipe.execute()
+
+    def delete_tagged(self, dataset, run_id):
+        keys = list(self.r.scan_iter(match=self._key(dataset, f"{run_id}-*"), count=1000))
+        for i in range(0, len(keys), 1000):
+            self.r.delete(*keys[i:i + 1000])
+        return len(keys)
+
+    def has_data(self, dataset):
+        return bool(self.sample_ids(dataset, 1))
+
+    def ensure_db(self, dataset):
+        pass
+
+
+BACKENDS = {
+    "mongodb": MongoBackend,
+    "couchdb": CouchBackend,
+    "redis": RedisBackend,
+}
+
+
+def to_json(doc):
+    # Mongo documents carry ObjectIds; the cache stores plain JSON
+    return json.dumps(doc, default=str)
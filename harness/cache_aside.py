@@ -0,0 +1,228 @@
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import redis
+
+from harness.backends import BACKENDS, to_json
+from harness.config import REDIS_HOST, REDIS_PORT
+from harness.keydist import DISTRIBUTIONS, KeyChooser
+from harness.stats import latency_rows, save_results, summarize
+from harness import telemetry as live
+
+# Add-to-cart with Redis as a cache-aside layer in front of the
+# product catalog in MongoDB or CouchDB:
+#   product read -> Redis GET; on a miss read the backend and SET (with TTL)
+#   cart update  -> always goes to the backend orders collection
+#
+#   python -m harness.cache_aside --backend mongodb --dist zipf --ttl 60 \
+#       --maxmemory 16mb --policy volatile-lfu
+#
+# maxmemory is instance-wide, so --maxmemory is a cache budget added on
+# top of what the instance already uses (the loaded datasets); the limit
+# is restored afterwards. The volatile-* policies only evict keys that
+# carry a TTL, so the datasets are never evicted. allkeys-* treats them
+# as cache entries too; use it only on a dedicated cache instance.
+# A SET refused with OOM (e.g. --ttl 0 under volatile-*) is counted
+# and the product is served uncached.
+
+CACHE_PREFIX = "cache:product:"
+POLICIES = ["volatile-lru", "volatile-lfu", "allkeys-lru", "allkeys-lfu"]
+
+
+# --------------------------------
+# CACHE SETUP
+# --------------------------------
+def clear_cache(cache):
+    keys = list(cache.scan_iter(match=CACHE_PREFIX + "*", count=1000))
+    for i in range(0, len(keys), 1000):
+        cache.delete(*keys[i:i + 1000])
+
+
+UNITS = {"kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "k": 1000, "m": 1000 ** 2, "g": 1000 ** 3}
+
+
+def parse_bytes(value):
+    value = str(value).strip().lower()
+    for unit in sorted(UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * UNITS[unit])
+    return int(value)
+
+
+def cache_bytes(cache):
+    # The cache tier only: used_memory also counts the loaded datasets
+    keys = list(cache.scan_iter(match=CACHE_PREFIX + "*", count=1000))
+    total = 0
+    for i in range(0, len(keys), 1000):
+        pipe = cache.pipeline(transaction=False)
+        for key in keys[i:i + 1000]:
+            pipe.memory_usage(key, samples=0)
+        total += sum(size or 0 for size in pipe.execute())
+    return total
+
+
+def configure_cache(cache, maxmemory, policy):
+    previous = {
+        "maxmemory": cache.config_get("maxmemory")["maxmemory"],
+        "maxmemory-policy": cache.config_get("maxmemory-policy")["maxmemory-policy"],
+    }
+    budget = parse_bytes(maxmemory)
+    if budget:
+        used = cache.info("memory")["used_memory"]
+        cache.config_set("maxmemory", used + budget)
+    cache.config_set("maxmemory-policy", policy)
+    return previous
+
+
+def restore_cache(cache, previous):
+    for name, value in previous.items():
+        cache.config_set(name, value)
+
+
+# --------------------------------
+# WORKLOAD
+# --------------------------------
+def add_to_cart(backend, cache, products, order_ids, rng, use_cache, ttl, counts):
+    product_id = products.pick(rng)
+    if use_cache:
+        key = f"{CACHE_PREFIX}{product_id}"
+        if cache.get(key) is not None:
+            counts["hits"] += 1
+        else:
+            counts["misses"] += 1
+            counts["backend_ops"] += 1
+            doc = backend.get("products", product_id)
+            try:
+                cache.set(key, to_json(doc), ex=ttl or None)
+            except redis.exceptions.OutOfMemoryError:
+                counts["oom"] += 1
+    else:
+        counts["backend_ops"] += 1
+        backend.get("products", product_id)
+
+    counts["backend_ops"] += 1
+    backend.incr("orders", order_ids[rng.randrange(len(order_ids))], "cart_items")
+
+
+def run_phase(backend, cache, products, order_ids, args, use_cache, duration, telemetry):
+    telemetry.set_phase("cache-aside" if use_cache else "no cache")
+    start = time.time()
+
+    def task(worker):
+        rng = random.Random(f"{args.seed}:{worker}:{use_cache}")
+        counts = {"hits": 0, "misses": 0, "backend_ops": 0, "oom": 0}
+        latencies = []
+        while time.time() - start < duration:
+            t0 = time.perf_counter()
+            add_to_cart(backend, cache, products, order_ids, rng, use_cache, args.ttl, counts)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            telemetry.record(latencies[-1])
+        return counts, latencies
+
+    with ThreadPoolExecutor(max_workers=args.threads) as ex:
+        parts = list(ex.map(task, range(args.threads)))
+    elapsed = time.time() - start
+
+    totals = {"hits": 0, "misses": 0, "backend_ops": 0, "oom": 0}
+    latencies = []
+    for counts, lat in parts:
+        for k in totals:
+            totals[k] += counts[k]
+        latencies.extend(lat)
+    return totals, latencies, len(latencies) / elapsed
+
+
+# --------------------------------
+# MAIN
+# --------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Cache-aside add-to-cart benchmark")
+    parser.add_argument("--backend", choices=["mongodb", "couchdb"], default="mongodb")
+    parser.add_argument("--ttl", type=int, default=300, help="seconds; 0 = no expiry")
+    parser.add_argument("--maxmemory", default="0", help="cache budget above current used_memory, e.g. 16mb; 0 = unlimited")
+    parser.add_argument("--policy", choices=POLICIES, default="volatile-lru")
+    parser.add_argument("--dist", choices=DISTRIBUTIONS, default="zipf")
+    parser.add_argument("--zipf-s", type=float, default=1.0)
+    parser.add_argument("--hot-fraction", type=float, default=0.2)
+    parser.add_argument("--hot-weight", type=float, default=0.8)
+    parser.add_argument("--products", type=int, default=10000, help="product keyspace size")
+    parser.add_argument("--orders", type=int, default=1000, help="orders receiving cart updates")
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="cache_aside_metrics.csv")
+    live.add_arguments(parser)
+    args = parser.parse_args()
+
+    backend = BACKENDS[args.backend]()
+    cache = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+
+    product_ids = backend.sample_ids("products", args.products)
+    order_ids = backend.sample_ids("orders", args.orders)
+    if not product_ids or not order_ids:
+        raise RuntimeError(f"Products or Orders not found in {backend.name}")
+    products = KeyChooser(product_ids, args.dist, args.zipf_s, args.hot_fraction, args.hot_weight)
+
+    label = f"Redis+{backend.name}"
+    print(f"\nCache-aside add-to-cart: {label}, {len(product_ids)} products, "
+          f"dist={args.dist}, ttl={args.ttl}s, maxmemory={args.maxmemory}, "
+          f"policy={args.policy}, threads={args.threads}\n")
+
+    telemetry = live.from_args(args).start()
+    print("Baseline (no cache)...")
+    base_counts, base_lat, base_tput = run_phase(
+        backend, cache, products, order_ids, args, False, args.duration, telemetry)
+
+    previous = configure_cache(cache, args.maxmemory, args.policy)
+    try:
+        clear_cache(cache)
+        if args.warmup:
+            print("Warming cache...")
+            run_phase(backend, cache, products, order_ids, args, True, args.warmup, telemetry)
+        before = cache.info("stats")
+        print("Cached...")
+        counts, lat, tput = run_phase(
+            backend, cache, products, order_ids, args, True, args.duration, telemetry)
+        after = cache.info("stats")
+        cache_mb = cache_bytes(cache) / (1024 ** 2)
+    finally:
+        telemetry.stop()
+        restore_cache(cache, previous)
+        clear_cache(cache)
+
+    lookups = counts["hits"] + counts["misses"]
+    hit_ratio = counts["hits"] / lookups if lookups else 0.0
+    ops_per_cart = counts["backend_ops"] / len(lat) if lat else 0.0
+    base_ops_per_cart = base_counts["backend_ops"] / len(base_lat) if base_lat else 0.0
+    reduction = 1 - ops_per_cart / base_ops_per_cart if base_ops_per_cart else 0.0
+    evicted = after["evicted_keys"] - before["evicted_keys"]
+    expired = after["expired_keys"] - before["expired_keys"]
+
+    s, b = summarize(lat), summarize(base_lat)
+    print(f"\nHit ratio: {hit_ratio:.3f}  (evicted {evicted}, expired {expired}, "
+          f"OOM on SET {counts['oom']})")
+    print(f"Backend ops per add-to-cart: {base_ops_per_cart:.2f} -> {ops_per_cart:.2f} "
+          f"({reduction:.1%} reduction)")
+    print(f"Add-to-cart p50/p99 (ms): {b['p50']:.3f}/{b['p99']:.3f} -> {s['p50']:.3f}/{s['p99']:.3f}")
+    print(f"Add-to-cart throughput (ops/sec): {base_tput:.1f} -> {tput:.1f}")
+
+    results = []
+    results += latency_rows(backend.name, "orders", "Add-to-Cart (no cache)", base_lat)
+    results.append([backend.name, "orders", "Add-to-Cart throughput (no cache)", None, base_tput])
+    results += latency_rows(label, "orders", "Add-to-Cart (cache-aside)", lat)
+    results.append([label, "orders", "Add-to-Cart throughput (cache-aside)", None, tput])
+    results += [
+        [label, "products", "Cache hit ratio", hit_ratio, None],
+        [label, "products", "Backend load reduction", reduction, None],
+        [label, "products", "Cache evicted keys", evicted, None],
+        [label, "products", "Cache OOM errors", counts["oom"], None],
+        [label, "products", "Cache memory (MB)", cache_mb, None],
+    ]
+    save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
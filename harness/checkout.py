@@ -0,0 +1,198 @@
+import argparse
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from harness.backends import BACKENDS
+from harness.config import BENCH_TAG_FIELD
+from harness.keydist import DISTRIBUTIONS, KeyChooser
+from harness.stats import latency_rows, save_results, summarize
+from harness import telemetry as live
+
+# Scripted shopping session, run by many concurrent simulated users:
+#   browse      one catalog page (PAGE_SIZE products fetched in one call)
+#   view_product / add_to_cart   repeated for each item put in the cart
+#   view_seller the marketplace seller page
+#   view_cart   read the cart back
+#   checkout    create an order from the cart and delete the cart
+#   decrement_stock   one stock update per purchased product
+#
+#   python -m harness.checkout --engine redis --engine mongodb --users 50
+#
+# styles.csv has no stock column, so the benchmark keeps a `stock`
+# counter per purchased product in its own "stock" records (id
+# <run_id>-<product id>) that simply go negative; only the cost of the
+# write matters, and the products dataset is never modified. Orders
+# created here carry BENCH_TAG_FIELD so they can be told apart from the
+# dataset; orders and stock records are deleted once the engine has
+# finished. A step that raises ends its session: the failure is
+# counted per step, the session is reported to telemetry as an error
+# and its cart is dropped.
+
+STEPS = ["browse", "view_product", "add_to_cart", "view_seller",
+         "view_cart", "checkout", "decrement_stock"]
+
+
+# --------------------------------
+# ONE SESSION
+# --------------------------------
+class StepFailed(Exception):
+    pass
+
+
+def session_steps(step, backend, products, page_ids, seller_ids, args, rng, run_id, session_id,
+                  touched):
+    first = rng.randrange(max(1, len(page_ids) - args.page_size))
+    step("browse", backend.get_many, "products", page_ids[first:first + args.page_size])
+
+    cart = {}
+    for _ in range(args.items):
+        product_id = products.pick(rng)
+        step("view_product", backend.get, "products", product_id)
+        step("add_to_cart", backend.incr, "carts", session_id, str(product_id), 1)
+        cart[product_id] = cart.get(product_id, 0) + 1
+
+    step("view_seller", backend.get, "sellers", seller_ids[rng.randrange(len(seller_ids))])
+    step("view_cart", backend.get, "carts", session_id)
+
+    def checkout():
+        order = {
+            BENCH_TAG_FIELD: run_id,
+            "session": session_id,
+            "items": {str(pid): qty for pid, qty in cart.items()},
+            "status": "placed",
+        }
+        backend.insert("orders", f"{run_id}-{session_id}", order)
+        backend.delete("carts", session_id)
+    step("checkout", checkout)
+
+    for product_id, qty in cart.items():
+        touched.add(product_id)
+        step("decrement_stock", backend.incr, "stock", f"{run_id}-{product_id}", "stock", -qty)
+
+
+def run_session(backend, products, page_ids, seller_ids, args, rng, run_id, timings, failures,
+                touched):
+    session_id = uuid.uuid4().hex
+
+    def step(name, func, *a):
+        t0 = time.perf_counter()
+        try:
+            out = func(*a)
+        except Exception as e:
+            failures[name] += 1
+            raise StepFailed(name) from e
+        timings[name].append((time.perf_counter() - t0) * 1000)
+        return out
+
+    start = time.perf_counter()
+    try:
+        session_steps(step, backend, products, page_ids, seller_ids, args, rng, run_id, session_id,
+                      touched)
+    except StepFailed:
+        try:
+            backend.delete("carts", session_id)
+        except Exception:
+            pass
+        return (time.perf_counter() - start) * 1000, False
+    timings["session"].append((time.perf_counter() - start) * 1000)
+    return timings["session"][-1], True
+
+
+# --------------------------------
+# CONCURRENT USERS
+# --------------------------------
+def run_engine(engine, args, run_id, telemetry):
+    backend = BACKENDS[engine]()
+    backend.ensure_db("carts")
+    backend.ensure_db("stock")
+    telemetry.set_phase(f"{engine}/checkout session")
+    if hasattr(backend, "conflicts"):
+        telemetry.add_count_source("conflicts", lambda: backend.conflicts)
+
+    product_ids = backend.sample_ids("products", args.products)
+    seller_ids = backend.sample_ids("sellers", args.sellers)
+    if not product_ids or not seller_ids:
+        raise RuntimeError(f"Products or Sellers not found in {backend.name}")
+    products = KeyChooser(product_ids, args.dist)
+
+    print(f"{backend.name}: {args.users} users, {args.items} items per session, "
+          f"{args.duration}s")
+    start = time.time()
+
+    def user(n):
+        rng = random.Random(f"{args.seed}:{n}")
+        timings = {name: [] for name in STEPS + ["session"]}
+        failures = {name: 0 for name in STEPS}
+        touched = set()
+        while time.time() - start < args.duration:
+            latency, ok = run_session(backend, products, product_ids, seller_ids,
+                                      args, rng, run_id, timings, failures, touched)
+            telemetry.record(latency, error=not ok)
+            if args.think_ms:
+                time.sleep(args.think_ms / 1000)
+        return timings, failures, touched
+
+    with ThreadPoolExecutor(max_workers=args.users) as ex:
+        parts = list(ex.map(user, range(args.users)))
+    elapsed = time.time() - start
+    removed = backend.delete_tagged("orders", run_id)
+    for product_id in set().union(*(touched for _, _, touched in parts)):
+        backend.delete("stock", f"{run_id}-{product_id}")
+
+    merged = {name: [] for name in STEPS + ["session"]}
+    failed = {name: 0 for name in STEPS}
+    for timings, failures, _ in parts:
+        for name, values in timings.items():
+            merged[name].extend(values)
+        for name, n in failures.items():
+            failed[name] += n
+
+    results = []
+    for name in STEPS + ["session"]:
+        s = summarize(merged[name])
+        if s["count"]:
+            print(f"  {name:<16} p50 {s['p50']:8.3f} ms  p95 {s['p95']:8.3f} ms  p99 {s['p99']:8.3f} ms")
+        results += latency_rows(backend.name, "checkout", f"Session {name}", merged[name])
+    for name in STEPS:
+        if failed[name]:
+            print(f"  {name:<16} failed {failed[name]} times")
+        results.append([backend.name, "checkout", f"Session {name} failures", failed[name], None])
+    sessions_per_sec = len(merged["session"]) / elapsed
+    print(f"  sessions/sec: {sessions_per_sec:.1f}, failed sessions: {sum(failed.values())}, "
+          f"benchmark orders removed: {removed}\n")
+    results.append([backend.name, "checkout", "Session throughput", None, sessions_per_sec])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-step checkout session benchmark")
+    parser.add_argument("--engine", choices=sorted(BACKENDS), action="append",
+                        help="repeatable; defaults to all engines")
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--items", type=int, default=3, help="items added per session")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--products", type=int, default=5000, help="product ids to draw from")
+    parser.add_argument("--sellers", type=int, default=1000)
+    parser.add_argument("--dist", choices=DISTRIBUTIONS, default="zipf")
+    parser.add_argument("--think-ms", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="checkout_metrics.csv")
+    live.add_arguments(parser)
+    args = parser.parse_args()
+    telemetry = live.from_args(args).start()
+
+    run_id = f"checkout-{int(time.time())}"
+    print(f"\nRunning checkout sessions (run id {run_id})...\n")
+
+    results = []
+    for engine in args.engine or ["mongodb", "couchdb", "redis"]:
+        results += run_engine(engine, args, run_id, telemetry)
+    telemetry.stop()
+    save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import json
+import os
+
+
+# --------------------------------
+# PER-SHARD CHECKPOINT FILES
+# --------------------------------
+# The shard count is part of the name: records move between shards
+# when the worker count changes, so old offsets no longer apply.
+def checkpoint_path(folder, engine, dataset, shard, n_shards):
+    return os.path.join(folder, f"{engine}_{dataset}_{shard}of{n_shards}.json")
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {"committed": 0, "complete": False, "error": None}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, committed, complete=False, error=None):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"committed": committed, "complete": complete, "error": error}, f)
+    # Atomic swap so a crash mid-write never leaves a torn checkpoint
+    os.replace(tmp, path)
+
+
+def clear_checkpoints(folder, engine, dataset):
+    if not os.path.isdir(folder):
+        return
+    for name in os.listdir(folder):
+        if name.startswith(f"{engine}_{dataset}_") and name.endswith(".json"):
+            os.remove(os.path.join(folder, name))
@@ -0,0 +1,43 @@
+# ========================= CONFIG ============================
+# Shared connection settings and dataset layout for the harness
+# scripts. The per-engine scripts keep their own copies of these.
+COUCH_URL = "http://127.0.0.1:5984"
+COUCH_USER = "ivan"        # UPDATE THIS
+COUCH_PASSWORD = "sigma"   # UPDATE THIS
+
+REDIS_HOST = "localhost"
+REDIS_PORT = 6379
+# Local instances for the client-side sharded mode (first N are used)
+REDIS_SHARD_PORTS = [6379, 6380, 6381, 6382, 6383, 6384, 6385, 6386]
+
+MONGO_URI = "mongodb://localhost:27017/"
+MONGO_DB = "ecommerce_db"
+
+DATA_FOLDER = r"c:\Users\Gyjyv\Downloads\AI lab test"  # UPDATE THIS
+CHECKPOINT_DIR = "checkpoints"
+
+# dataset -> (csv file, key field, redis key prefix)
+DATASETS = {
+    "orders": ("online_retail_II.csv", "Invoice", "order"),
+    "transactions": ("data.csv", "InvoiceNo", "transaction"),
+    # data.csv again, one record per line item; the analytics workload
+    # aggregates this one so every engine sees every line
+    "transaction_lines": ("data.csv", "InvoiceNo", "transaction_line"),
+    "products": ("styles.csv", "id", "product"),
+    "sellers": ("olist_sellers_dataset.csv", "seller_id", "seller"),
+}
+
+# Datasets keyed per source line (<key field value>-<row index>)
+# rather than by the key field alone
+LINE_KEYED = {"transaction_lines"}
+
+# Collections the workloads create themselves -> redis key prefix
+WORKLOAD_PREFIXES = {
+    "carts": "cart",
+    "counters": "counter",
+    "stock": "stock",
+}
+
+# Field stamped on every record a benchmark creates, holding the run id
+BENCH_TAG_FIELD = "bench_run"
+# =============================================================
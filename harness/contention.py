@@ -0,0 +1,197 @@
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from harness.backends import BACKENDS
+from harness.config import COUCH_URL
+from harness.stats import latency_rows, save_results, summarize
+from harness import telemetry as live
+
+# Hot-key contention: a fixed number of threads increment counters
+# spread over 1..N hot keys. With one hot key this is the situation
+# every existing update workload is in (update_doc, add_to_cart and
+# hincrby(order_key, "cart_items", 1) all hit a single record).
+#
+# Each cell runs in two modes:
+#   single   one record per counter
+#   sharded  each counter split into --shards parts, a write picks one
+#            at random and a read sums them:
+#              Redis   one hash per counter, one field per shard
+#              MongoDB one document per shard ("<counter>:<shard>")
+#              CouchDB one document per shard, summed by a _sum view
+#
+#   python -m harness.contention --engine couchdb --threads 100 --hot-keys 1 4 16 64
+#
+# After each cell the counters are read back and compared with the
+# number of increments that returned, which exposes lost updates.
+
+COUNTER_DDOC = {
+    "views": {
+        "total": {
+            "map": "function (doc) { var i = doc._id.lastIndexOf(':');"
+                   " if (i > 0) { emit(doc._id.substring(0, i), doc.value || 0); } }",
+            "reduce": "_sum",
+        }
+    }
+}
+
+
+# --------------------------------
+# COUNTER LAYOUT PER ENGINE
+# --------------------------------
+def shard_target(engine, counter, shard):
+    # -> (record id, field) touched by one increment
+    if shard is None:
+        return counter, "value"
+    if engine == "redis":
+        return counter, f"shard{shard}"
+    return f"{counter}:{shard}", "value"
+
+
+def read_total(backend, engine, counter, sharded):
+    if not sharded:
+        record = backend.get("counters", counter) or {}
+        return int(record.get("value") or 0)
+    if engine == "redis":
+        return sum(int(v) for v in (backend.get("counters", counter) or {}).values())
+    if engine == "mongodb":
+        rows = backend.db.counters.aggregate([
+            {"$match": {"_id": {"$regex": f"^{counter}:"}}},
+            {"$group": {"_id": None, "total": {"$sum": "$value"}}},
+        ])
+        rows = list(rows)
+        return rows[0]["total"] if rows else 0
+    r = backend.session.get(f"{COUCH_URL}/counters/_design/counters/_view/total",
+                            params={"key": f'"{counter}"', "group": "true"})
+    rows = r.json()["rows"]
+    return rows[0]["value"] if rows else 0
+
+
+def reset_counters(backend, engine):
+    if engine == "redis":
+        keys = list(backend.r.scan_iter(match="counter:*", count=1000))
+        for i in range(0, len(keys), 1000):
+            backend.r.delete(*keys[i:i + 1000])
+    elif engine == "mongodb":
+        backend.db.counters.drop()
+    else:
+        backend.session.delete(f"{COUCH_URL}/counters")
+        backend.session.put(f"{COUCH_URL}/counters")
+        backend.session.put(f"{COUCH_URL}/counters/_design/counters", json=COUNTER_DDOC)
+
+
+# --------------------------------
+# ONE CELL: (hot keys, mode)
+# --------------------------------
+def run_cell(backend, engine, n_keys, shards, args, cell, telemetry):
+    counters = [f"{cell}-k{k}" for k in range(n_keys)]
+    conflicts_before = getattr(backend, "conflicts", 0)
+    start = time.time()
+
+    def task(worker):
+        rng = random.Random(f"{args.seed}:{cell}:{worker}")
+        done = {c: 0 for c in counters}
+        latencies = []
+        errors = 0
+        while time.time() - start < args.duration:
+            counter = counters[rng.randrange(n_keys)]
+            shard = rng.randrange(shards) if shards else None
+            record_id, field = shard_target(engine, counter, shard)
+            t0 = time.perf_counter()
+            failed = False
+            try:
+                backend.incr("counters", record_id, field, 1)
+                done[counter] += 1
+            except Exception:  # gave up after conflicts, duplicate upsert, ...
+                failed = True
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+            telemetry.record(latencies[-1], failed)
+        return done, latencies, errors
+
+    with ThreadPoolExecutor(max_workers=args.threads) as ex:
+        parts = list(ex.map(task, range(args.threads)))
+    elapsed = time.time() - start
+
+    expected = {c: 0 for c in counters}
+    latencies = []
+    errors = 0
+    for done, lat, err in parts:
+        for c, n in done.items():
+            expected[c] += n
+        latencies.extend(lat)
+        errors += err
+
+    read_lat = []
+    lost = 0
+    for c in counters:
+        t0 = time.perf_counter()
+        total = read_total(backend, engine, c, bool(shards))
+        read_lat.append((time.perf_counter() - t0) * 1000)
+        lost += expected[c] - total
+
+    return {
+        "throughput": sum(expected.values()) / elapsed,
+        "latencies": latencies,
+        "read_latencies": read_lat,
+        "errors": errors,
+        "lost": lost,
+        "conflicts": getattr(backend, "conflicts", 0) - conflicts_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-key contention benchmark")
+    parser.add_argument("--engine", choices=sorted(BACKENDS), action="append",
+                        help="repeatable; defaults to all engines")
+    parser.add_argument("--threads", type=int, default=100)
+    parser.add_argument("--hot-keys", type=int, nargs="+", default=[1, 2, 4, 16, 64, 256])
+    parser.add_argument("--shards", type=int, default=16, help="shards per counter in sharded mode")
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="contention_metrics.csv")
+    live.add_arguments(parser)
+    args = parser.parse_args()
+    telemetry = live.from_args(args).start()
+
+    run = int(time.time())
+    results = []
+    print(f"\nRunning hot-key contention ({args.threads} threads)...\n")
+
+    for engine in args.engine or ["mongodb", "couchdb", "redis"]:
+        backend = BACKENDS[engine]()
+        reset_counters(backend, engine)
+        if hasattr(backend, "conflicts"):
+            telemetry.add_count_source("conflicts", lambda b=backend: b.conflicts)
+        print(f"{backend.name}")
+        print(f"{'keys':>6} {'mode':>12} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'read ms':>8} {'conflicts':>9} {'lost':>6}")
+
+        for n_keys in args.hot_keys:
+            for shards in (0, args.shards):
+                mode = f"sharded x{shards}" if shards else "single"
+                cell = f"{run}-{n_keys}-{shards}"
+                telemetry.set_phase(f"{engine}/{n_keys} keys/{mode}")
+                out = run_cell(backend, engine, n_keys, shards, args, cell, telemetry)
+                s, rd = summarize(out["latencies"]), summarize(out["read_latencies"])
+                print(f"{n_keys:>6} {mode:>12} {out['throughput']:>10.1f} {s['p50'] or 0:>8.3f} "
+                      f"{s['p99'] or 0:>8.3f} {rd['mean'] or 0:>8.3f} {out['conflicts']:>9} {out['lost']:>6}")
+
+                label = f"{n_keys} hot keys, {mode}"
+                results += latency_rows(backend.name, "counters", f"Increment ({label})", out["latencies"])
+                results += [
+                    [backend.name, "counters", f"Increment throughput ({label})", None, out["throughput"]],
+                    [backend.name, "counters", f"Counter read latency ({label})", rd["mean"], None],
+                    [backend.name, "counters", f"Write conflicts ({label})", out["conflicts"], None],
+                    [backend.name, "counters", f"Failed increments ({label})", out["errors"], None],
+                    [backend.name, "counters", f"Lost updates ({label})", out["lost"], None],
+                ]
+        print()
+
+    telemetry.stop()
+    save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import bisect
+import csv
+import hashlib
+import json
+import os
+import random
+import re
+import zlib
+from collections import Counter
+from datetime import datetime
+
+from harness.config import DATA_FOLDER, DATASETS
+from harness.records import try_convert
+
+# Synthetic data at arbitrary scale factors for data-size sweeps.
+#
+# 1. Profile the real CSVs once (writes profiles/<dataset>.json):
+#      python -m harness.datagen profile
+# 2. Generate at any scale, e.g. straight into a loader:
+#      python -m harness.load_coordinator --engine redis --scale 10 --seed 7
+#    or preview a few rows:
+#      python -m harness.datagen preview --dataset orders --scale 0.1
+#
+# Columns are modelled independently (null rate + categorical
+# frequencies, value quantiles or distinct-value ratio), so marginals
+# and cardinalities match the source; cross-column correlations do not.
+
+PROFILE_DIR = "profiles"
+CATEGORICAL_LIMIT = 2000   # more distinct values than this -> not categorical
+SAMPLE_SIZE = 10000        # reservoir size for numeric quantiles
+QUANTILES = 100
+
+DATETIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%Y-%m-%d"]
+HEX_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+# --------------------------------
+# PROFILING
+# --------------------------------
+def parse_datetime(v):
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(v, fmt).timestamp(), fmt
+        except ValueError:
+            pass
+    return None, None
+
+
+def quantiles(values):
+    values = sorted(values)
+    last = len(values) - 1
+    return [values[round(last * q / QUANTILES)] for q in range(QUANTILES + 1)]
+
+
+class ColumnStats:
+    def __init__(self, rng):
+        self.rng = rng
+        self.nulls = 0
+        self.seen = 0
+        self.counts = Counter()
+        self.distinct = set()        # crc32 of every value, for cardinality
+        self.sample = []             # reservoir of numeric / epoch values
+        self.numeric = True
+        self.is_int = True
+        self.dt_format = None
+        self.datetime = True
+        self.hex = True
+
+    def add(self, raw):
+        self.seen += 1
+        v = try_convert(raw)
+        if v is None:
+            self.nulls += 1
+            return
+        n = self.seen - self.nulls
+        self.distinct.add(zlib.crc32(str(v).encode("utf-8")))
+        if self.counts is not None:
+            self.counts[v] += 1
+            if len(self.counts) > CATEGORICAL_LIMIT:
+                self.counts = None
+
+        if isinstance(v, str):
+            self.numeric = False
+            self.hex = self.hex and bool(HEX_ID.match(v))
+            if self.datetime:
+                ts, fmt = parse_datetime(v)
+                if ts is None or (self.dt_format and fmt != self.dt_format):
+                    self.datetime = False
+                else:
+                    self.dt_format = fmt
+                    self._sample(ts, n)
+        else:
+            self.datetime = False
+            self.hex = False
+            self.is_int = self.is_int and isinstance(v, int)
+            if self.numeric:
+                self._sample(v, n)
+
+    def _sample(self, v, n):
+        if len(self.sample) < SAMPLE_SIZE:
+            self.sample.append(v)
+        else:
+            j = self.rng.randrange(n)
+            if j < SAMPLE_SIZE:
+                self.sample[j] = v
+
+    def profile(self):
+        present = self.seen - self.nulls
+        col = {
+            "null_rate": self.nulls / self.seen if self.seen else 1.0,
+            "distinct_ratio": len(self.distinct) / present if present else 0.0,
+        }
+        if present == 0:
+            col["kind"] = "null"
+        elif self.counts is not None:
+            values, weights = zip(*self.counts.most_common())
+            col.update(kind="categorical", values=list(values), weights=list(weights))
+        elif self.numeric:
+            col.update(kind="numeric", is_int=self.is_int, quantiles=quantiles(self.sample))
+        elif self.datetime:
+            col.update(kind="datetime", format=self.dt_format, quantiles=quantiles(self.sample))
+        else:
+            col.update(kind="hex" if self.hex else "text")
+        return col
+
+
+def profile_dataset(dataset, data_folder=DATA_FOLDER):
+    filename, key_field, _ = DATASETS[dataset]
+    path = os.path.join(data_folder, filename)
+    rng = random.Random(0)
+    rows = 0
+    with open(path, "r", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        stats = {name: ColumnStats(rng) for name in reader.fieldnames}
+        for row in reader:
+            rows += 1
+            for name, col in stats.items():
+                col.add(row.get(name))
+
+    columns = {name: col.profile() for name, col in stats.items()}
+    key = columns[key_field]
+    return {
+        "dataset": dataset,
+        "rows": rows,
+        "key_field": key_field,
+        # orders/transactions repeat the invoice key once per line item
+        "rows_per_key": 1 / key["distinct_ratio"] if key["distinct_ratio"] else 1.0,
+        "columns": columns,
+    }
+
+
+def profile_path(dataset, profile_dir=PROFILE_DIR):
+    return os.path.join(profile_dir, f"{dataset}.json")
+
+
+def load_profile(dataset, profile_dir=PROFILE_DIR):
+    path = profile_path(dataset, profile_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No profile for '{dataset}' at {path}; run "
+                                f"'python -m harness.datagen profile' first")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --------------------------------
+# GENERATION
+# --------------------------------
+def from_quantiles(qs, rng):
+    # Piecewise-linear inverse CDF through the stored quantiles
+    pos = rng.random() * (len(qs) - 1)
+    i = int(pos)
+    if i >= len(qs) - 1:
+        return qs[-1]
+    return qs[i] + (qs[i + 1] - qs[i]) * (pos - i)
+
+
+class Generator:
+    def __init__(self, profile, scale, seed):
+        self.profile = profile
+        self.seed = seed
+        self.rows = max(1, round(profile["rows"] * scale))
+        self.key_field = profile["key_field"]
+        self.rows_per_key = max(1.0, profile["rows_per_key"])
+        self.columns = {}
+        for name, col in profile["columns"].items():
+            col = dict(col)
+            present = self.rows * (1 - col["null_rate"])
+            # Distinct values grow with the data, except for categoricals
+            col["cardinality"] = max(1, round(present * col["distinct_ratio"]))
+            if col["kind"] == "categorical":
+                col["cum_weights"] = []
+                total = 0
+                for w in col["weights"]:
+                    total += w
+                    col["cum_weights"].append(total)
+            self.columns[name] = col
+
+    def key(self, i):
+        idx = int(i / self.rows_per_key)
+        col = self.columns[self.key_field]
+        if col["kind"] == "hex":
+            return hashlib.md5(f"{self.seed}:{idx}".encode("utf-8")).hexdigest()
+        if col["kind"] == "numeric" and col["is_int"]:
+            return str(int(col["quantiles"][0]) + idx)
+        return f"{self.key_field}-{idx}"
+
+    def value(self, name, col, rng):
+        if rng.random() < col["null_rate"]:
+            return None
+        kind = col["kind"]
+        if kind == "categorical":
+            x = rng.random() * col["cum_weights"][-1]
+            return col["values"][bisect.bisect_right(col["cum_weights"], x)]
+        if kind == "numeric":
+            v = from_quantiles(col["quantiles"], rng)
+            return round(v) if col["is_int"] else round(v, 2)
+        if kind == "datetime":
+            ts = from_quantiles(col["quantiles"], rng)
+            return datetime.fromtimestamp(ts).strftime(col["format"])
+        n = rng.randrange(col["cardinality"])
+        if kind == "hex":
+            return hashlib.md5(f"{name}:{n}".encode("utf-8")).hexdigest()
+        if kind == "text":
+            return f"{name}-{n}"
+        return None
+
+    def record(self, i):
+        # One RNG per row: row i is identical no matter which process
+        # generates it or which rows were skipped before it.
+        rng = random.Random(f"{self.seed}:{self.profile['dataset']}:{i}")
+        record = {name: self.value(name, col, rng) for name, col in self.columns.items()}
+        key = self.key(i)
+        record[self.key_field] = try_convert(key)
+        return record
+
+    def iter_records(self, keep=None, per_line=False):
+        # keep(key) lets a shard worker skip the cost of building rows
+        # that belong to other shards.
+        for i in range(self.rows):
+            key = self.key(i)
+            if per_line:
+                key = f"{key}-{i}"
+            if keep is not None and not keep(key):
+                continue
+            yield key, self.record(i)
+
+
+def iter_synthetic_records(dataset, scale, seed, keep=None, profile_dir=PROFILE_DIR,
+                           per_line=False):
+    return Generator(load_profile(dataset, profile_dir), scale, seed).iter_records(keep, per_line)
+
+
+# --------------------------------
+# CLI
+# --------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic scale-factor data generator")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("profile", help="learn column distributions from the CSVs")
+    p.add_argument("--dataset", choices=list(DATASETS), action="append")
+    p.add_argument("--data-folder", default=DATA_FOLDER)
+    p.add_argument("--profile-dir", default=PROFILE_DIR)
+
+    g = sub.add_parser("preview", help="print the first rows of a synthetic dataset")
+    g.add_argument("--dataset", choices=list(DATASETS), required=True)
+    g.add_argument("--scale", type=float, default=1.0)
+    g.add_argument("--seed", type=int, default=0)
+    g.add_argument("--rows", type=int, default=5)
+    g.add_argument("--profile-dir", default=PROFILE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "profile":
+        os.makedirs(args.profile_dir, exist_ok=True)
+        for dataset in args.dataset or list(DATASETS):
+            profile = profile_dataset(dataset, args.data_folder)
+            with open(profile_path(dataset, args.profile_dir), "w", encoding="utf-8") as f:
+                json.dump(profile, f, indent=1)
+            kinds = Counter(c["kind"] for c in profile["columns"].values())
+            print(f"Profiled {dataset}: {profile['rows']} rows, "
+                  f"{profile['rows_per_key']:.2f} rows/key, columns {dict(kinds)}")
+    else:
+        gen = Generator(load_profile(args.dataset, args.profile_dir), args.scale, args.seed)
+        print(f"{args.dataset} at scale {args.scale}: {gen.rows} rows")
+        for _, (key, record) in zip(range(args.rows), gen.iter_records()):
+            print(key, record)
+
+
+if __name__ == "__main__":
+    main()
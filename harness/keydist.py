@@ -0,0 +1,46 @@
+import bisect
+
+
+# --------------------------------
+# KEY ACCESS DISTRIBUTIONS
+# --------------------------------
+# uniform : every key equally likely
+# zipf    : key of rank k chosen with weight 1 / k**s
+# hotspot : hot_weight of the requests go to the first hot_fraction of keys
+DISTRIBUTIONS = ["uniform", "zipf", "hotspot"]
+
+
+class KeyChooser:
+    def __init__(self, keys, dist="uniform", zipf_s=1.0, hot_fraction=0.2, hot_weight=0.8):
+        if not keys:
+            raise ValueError("KeyChooser needs at least one key")
+        self.keys = list(keys)
+        n = len(self.keys)
+        if dist == "uniform":
+            weights = None
+        elif dist == "zipf":
+            weights = [1 / (k ** zipf_s) for k in range(1, n + 1)]
+        elif dist == "hotspot":
+            n_hot = max(1, int(n * hot_fraction))
+            n_cold = n - n_hot
+            weights = [hot_weight / n_hot] * n_hot
+            if n_cold:
+                weights += [(1 - hot_weight) / n_cold] * n_cold
+        else:
+            raise ValueError(f"unknown distribution '{dist}'")
+
+        self.cum_weights = None
+        if weights:
+            total = 0.0
+            self.cum_weights = []
+            for w in weights:
+                total += w
+                self.cum_weights.append(total)
+
+    def pick(self, rng):
+        # rng is passed in so each thread can own its random.Random
+        if self.cum_weights is None:
+            return self.keys[rng.randrange(len(self.keys))]
+        x = rng.random() * self.cum_weights[-1]
+        i = bisect.bisect_right(self.cum_weights, x)
+        return self.keys[min(i, len(self.keys) - 1)]
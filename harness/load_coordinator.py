@@ -0,0 +1,226 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+
+import requests
+
+from harness.autotune import BatchTuner, split_write
+from harness.config import (
+    COUCH_URL, COUCH_USER, COUCH_PASSWORD, DATA_FOLDER, CHECKPOINT_DIR, DATASETS, LINE_KEYED,
+)
+from harness.checkpoints import (
+    checkpoint_path, load_checkpoint, save_checkpoint, clear_checkpoints,
+)
+from harness.datagen import PROFILE_DIR, iter_synthetic_records
+from harness.records import iter_csv_records, shard_of
+from harness.sinks import open_sink, SINKS
+
+# Usage (from the repository root):
+#   python -m harness.load_coordinator --engine couchdb --dataset orders --workers 8
+# Rerunning the same command after a crash or failed batch resumes
+# each shard from its last committed batch. --reset starts over.
+# Batch size and in-flight batches are autotuned (harness.autotune)
+# unless --batch-size is given.
+# --scale/--seed stream synthetic rows from harness.datagen instead
+# of reading the CSV files.
+
+
+# --------------------------------
+# RECORD SOURCE
+# --------------------------------
+def iter_source(task):
+    shard, n_shards = task["shard"], task["n_shards"]
+    keep = lambda key: shard_of(key, n_shards) == shard
+    per_line = task["dataset"] in LINE_KEYED
+    if task["scale"] is not None:
+        return iter_synthetic_records(
+            task["dataset"], task["scale"], task["seed"],
+            keep=keep, profile_dir=task["profile_dir"], per_line=per_line,
+        )
+    _, key_field, _ = DATASETS[task["dataset"]]
+    return iter_csv_records(task["path"], key_field, keep=keep, per_line=per_line)
+
+
+def source_label(dataset, scale, seed, redis_shards=None):
+    # Synthetic runs get their own checkpoints per scale factor and seed,
+    # sharded Redis loads per instance count
+    label = dataset if scale is None else f"{dataset}-sf{scale:g}-seed{seed}"
+    return label if not redis_shards else f"{label}-redis{redis_shards}"
+
+
+# --------------------------------
+# WORKER (ONE PROCESS PER SHARD)
+# --------------------------------
+def timed_write(write, batch, tuner):
+    t0 = time.time()
+    existing, size = split_write(write, batch, tuner)
+    return existing, size, time.time() - t0
+
+
+def load_shard(task):
+    shard, n_shards = task["shard"], task["n_shards"]
+    ckpt = checkpoint_path(task["checkpoint_dir"], task["engine"],
+                           task["label"], shard, n_shards)
+    state = load_checkpoint(ckpt)
+    stats = {"shard": shard, "written": 0, "existing": 0,
+             "skipped": state["committed"], "seconds": 0.0, "error": None, "tuning": None}
+
+    if state["complete"]:
+        return stats
+
+    label = f"{task['engine']}/{task['label']}#{shard}"
+    tuner = (BatchTuner(label=label) if task["batch_size"] is None
+             else BatchTuner.fixed_size(task["batch_size"], label=label))
+    committed = state["committed"]
+    seen = 0
+    batch = []
+    # Batches complete out of order, but the checkpoint only moves past
+    # a batch once every batch submitted before it has been written
+    pending = deque()
+    start = time.time()
+
+    def commit_oldest():
+        nonlocal committed
+        future, n = pending.popleft()
+        existing, size, seconds = future.result()
+        tuner.observe(n, size, seconds)
+        stats["existing"] += existing
+        stats["written"] += n
+        committed += n
+        save_checkpoint(ckpt, committed)
+
+    def submit(pool):
+        while len(pending) >= tuner.inflight:
+            commit_oldest()
+        pending.append((pool.submit(timed_write, write, list(batch), tuner), len(batch)))
+        batch.clear()
+
+    with ThreadPoolExecutor(max_workers=tuner.max_inflight) as pool:
+        try:
+            # Inside the try, so an unreachable server fails this shard's
+            # checkpoint instead of the whole pool
+            write = open_sink(task["engine"], task["dataset"], redis_shards=task["redis_shards"],
+                              aggregates=task["aggregates"])
+            for key, record in iter_source(task):
+                seen += 1
+                # Everything up to the checkpoint is already on the server
+                if seen <= state["committed"]:
+                    continue
+                batch.append((key, record))
+                if len(batch) >= tuner.batch_size:
+                    submit(pool)
+            if batch:
+                submit(pool)
+            while pending:
+                commit_oldest()
+            save_checkpoint(ckpt, committed, complete=True)
+        except Exception as e:
+            stats["error"] = str(e)
+            save_checkpoint(ckpt, committed, error=str(e))
+
+    stats["seconds"] = time.time() - start
+    stats["tuning"] = tuner.summary()
+    return stats
+
+
+# --------------------------------
+# COORDINATOR
+# --------------------------------
+def create_couch_db(db_name):
+    url = f"{COUCH_URL}/{db_name}"
+    r = requests.get(url, auth=(COUCH_USER, COUCH_PASSWORD))
+    if r.status_code != 200:
+        r = requests.put(url, auth=(COUCH_USER, COUCH_PASSWORD))
+        if r.status_code not in (200, 201):
+            raise RuntimeError(f"ERROR creating DB {db_name}: {r.text}")
+
+
+def report(engine, dataset, all_stats, wall):
+    print(f"\n{engine} / {dataset}")
+    print(f"{'shard':>5} {'written':>10} {'resumed':>10} {'existing':>9} {'secs':>8} {'rec/s':>10}  status")
+    for s in sorted(all_stats, key=lambda s: s["shard"]):
+        rate = s["written"] / s["seconds"] if s["seconds"] else 0.0
+        status = f"FAILED: {s['error']}" if s["error"] else "ok"
+        print(f"{s['shard']:>5} {s['written']:>10} {s['skipped']:>10} {s['existing']:>9} "
+              f"{s['seconds']:>8.2f} {rate:>10.1f}  {status}")
+
+    for s in sorted(all_stats, key=lambda s: s["shard"]):
+        if s["tuning"]:
+            print(f"  {s['tuning']}")
+
+    total = sum(s["written"] for s in all_stats)
+    print(f"Aggregate: {total} records in {wall:.2f}s "
+          f"({total / wall if wall else 0.0:.1f} rec/s across {len(all_stats)} workers)")
+
+
+def run_load(engine, dataset, workers, batch_size, data_folder, checkpoint_dir,
+             scale=None, seed=0, profile_dir=PROFILE_DIR, redis_shards=None,
+             aggregates=False):
+    filename, _, _ = DATASETS[dataset]
+    path = os.path.join(data_folder, filename)
+    if scale is None and not os.path.exists(path):
+        raise FileNotFoundError(f"CSV file not found: {path}")
+
+    if engine == "couchdb":
+        create_couch_db(dataset)
+
+    tasks = [{
+        "engine": engine, "dataset": dataset, "path": path,
+        "shard": shard, "n_shards": workers, "batch_size": batch_size,
+        "checkpoint_dir": checkpoint_dir,
+        "label": source_label(dataset, scale, seed, redis_shards),
+        "scale": scale, "seed": seed, "profile_dir": profile_dir,
+        "redis_shards": redis_shards, "aggregates": aggregates,
+    } for shard in range(workers)]
+
+    start = time.time()
+    with Pool(processes=workers) as pool:
+        all_stats = pool.map(load_shard, tasks)
+    report(engine, source_label(dataset, scale, seed, redis_shards), all_stats, time.time() - start)
+
+    return all(s["error"] is None for s in all_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded, resumable dataset loader")
+    parser.add_argument("--engine", choices=sorted(SINKS), required=True)
+    parser.add_argument("--dataset", choices=list(DATASETS), action="append",
+                        help="repeatable; defaults to all datasets")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--batch-size", type=int,
+                        help="fixed batch size; by default it is autotuned per shard")
+    parser.add_argument("--data-folder", default=DATA_FOLDER)
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+    parser.add_argument("--scale", type=float,
+                        help="load synthetic data at this scale factor instead of the CSVs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile-dir", default=PROFILE_DIR)
+    parser.add_argument("--redis-shards", type=int,
+                        help="spread Redis keys over the first N REDIS_SHARD_PORTS instances")
+    parser.add_argument("--aggregates", action="store_true",
+                        help="maintain the Redis analytics counters while loading transaction_lines")
+    parser.add_argument("--reset", action="store_true",
+                        help="discard checkpoints and load from the start")
+    args = parser.parse_args()
+
+    ok = True
+    for dataset in args.dataset or list(DATASETS):
+        if args.reset:
+            clear_checkpoints(args.checkpoint_dir, args.engine,
+                              source_label(dataset, args.scale, args.seed, args.redis_shards))
+        ok &= run_load(args.engine, dataset, args.workers, args.batch_size,
+                       args.data_folder, args.checkpoint_dir,
+                       args.scale, args.seed, args.profile_dir, args.redis_shards,
+                       args.aggregates)
+
+    if not ok:
+        print("\nSome shards failed. Rerun the same command to resume from the checkpoints.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
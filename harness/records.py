@@ -0,0 +1,50 @@
+import csv
+import zlib
+
+
+# --------------------------------
+# VALUE CONVERSION
+# --------------------------------
+def try_convert(v):
+    if v is None or v == "":
+        return None
+    try:
+        return int(v)
+    except ValueError:
+        pass
+    try:
+        return float(v)
+    except ValueError:
+        pass
+    return v
+
+
+# --------------------------------
+# RECORD STREAMS
+# --------------------------------
+# Every source yields (key, record) pairs in a stable order, so a
+# worker that re-reads the source sees the same sequence each time.
+# keep(key) is checked before the rest of the row is converted, so a
+# shard worker only pays for the rows it actually loads. per_line
+# appends the row index, giving every line its own key.
+def iter_csv_records(path, key_field, keep=None, per_line=False):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for idx, row in enumerate(reader):
+            key = try_convert(row.get(key_field))
+            # Same fallback as the Redis loaders: row index when the key is missing
+            key = str(key if key is not None else idx)
+            if per_line:
+                key = f"{key}-{idx}"
+            if keep is not None and not keep(key):
+                continue
+            yield key, {k: try_convert(v) for k, v in row.items()}
+
+
+# --------------------------------
+# SHARDING
+# --------------------------------
+# crc32 rather than hash(): str hashes are salted per process,
+# and every worker has to agree on where a key lives.
+def shard_of(key, n_shards):
+    return zlib.crc32(str(key).encode("utf-8")) % n_shards
@@ -0,0 +1,163 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+
+from harness.backends import RedisBackend
+from harness.checkpoints import clear_checkpoints
+from harness.config import CHECKPOINT_DIR, DATA_FOLDER, DATASETS
+from harness.load_coordinator import run_load, source_label
+from harness.redis_shards import ShardedRedis
+from harness.stats import latency_rows, save_results, summarize
+
+# Redis scale-out: the same workloads against 1, 2, 4, ... local
+# redis-server instances with client-side hash-slot sharding.
+#
+#   for p in 6379 6380 6381 6382; do redis-server --port $p --save "" --daemonize yes; done
+#   python -m harness.redis_scaleout --shards 1 2 4 --load
+#
+# --load reloads products and orders for every shard count (keys move
+# between instances when N changes); without it the data must already
+# be laid out for each N. It deletes those datasets from every instance
+# first, including the main one on port 6379, which afterwards holds
+# only its 1/N share -- reload normally before running the other
+# benchmarks. Load is generated by several client processes, since one
+# Python process saturates long before N servers.
+
+WORKLOADS = ["read", "update", "add_to_cart"]
+LOADED = ["products", "orders"]
+
+
+# --------------------------------
+# DATA LAYOUT
+# --------------------------------
+def reload(n_shards, args):
+    # Remove the datasets from every instance the sweep uses, then load
+    # them for this shard count. Keys are deleted on the instance SCAN
+    # found them on: they may have been placed under another N (or by a
+    # normal single-instance load), so the slot map can't locate them
+    everything = ShardedRedis(max(args.shards))
+    for dataset in LOADED:
+        prefix = DATASETS[dataset][2]
+        for shard in everything.shards:
+            keys = list(shard.scan_iter(match=f"{prefix}:*", count=5000))
+            for i in range(0, len(keys), 5000):
+                shard.delete(*keys[i:i + 5000])
+        clear_checkpoints(CHECKPOINT_DIR, "redis",
+                          source_label(dataset, args.scale, args.seed, n_shards))
+        run_load("redis", dataset, args.workers, None, args.data_folder, CHECKPOINT_DIR,
+                 args.scale, args.seed, redis_shards=n_shards)
+
+
+def sample_ids(client, dataset, n):
+    # An equal share from every instance: SCAN over ShardedRedis walks the
+    # instances in order, so a plain sample would all come from the first.
+    # Stale keys left by a load for another N route elsewhere and are skipped.
+    prefix = DATASETS[dataset][2] + ":"
+    quota = -(-n // len(client.shards))
+    per_shard = []
+    for index, shard in enumerate(client.shards):
+        ids = []
+        for key in shard.scan_iter(match=prefix + "*", count=1000):
+            if client.shard_index(key) == index:
+                ids.append(key[len(prefix):])
+                if len(ids) >= quota:
+                    break
+        per_shard.append(ids)
+    missing = [port for port, ids in zip(client.ports, per_shard) if not ids]
+    if missing:
+        raise RuntimeError(f"No {dataset} on Redis port(s) {missing}; run with --load")
+    return [i for ids in per_shard for i in ids], [len(ids) for ids in per_shard]
+
+
+# --------------------------------
+# CLIENT PROCESS
+# --------------------------------
+def client_process(job):
+    n_shards, workload, product_ids, order_ids, threads, duration, seed = job
+    backend = RedisBackend(client=ShardedRedis(n_shards))
+
+    def op(rng):
+        if workload == "read":
+            backend.get("products", product_ids[rng.randrange(len(product_ids))])
+        elif workload == "update":
+            backend.incr("orders", order_ids[rng.randrange(len(order_ids))], "bench_update", 1)
+        else:
+            backend.get("products", product_ids[rng.randrange(len(product_ids))])
+            backend.incr("orders", order_ids[rng.randrange(len(order_ids))], "cart_items", 1)
+
+    start = time.time()
+
+    def task(worker):
+        rng = random.Random(f"{seed}:{worker}")
+        latencies = []
+        while time.time() - start < duration:
+            t0 = time.perf_counter()
+            op(rng)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        parts = list(ex.map(task, range(threads)))
+    return [lat for part in parts for lat in part], time.time() - start
+
+
+def run_step(n_shards, workload, product_ids, order_ids, args):
+    jobs = [(n_shards, workload, product_ids, order_ids, args.threads, args.duration,
+             f"{args.seed}:{p}") for p in range(args.processes)]
+    with Pool(processes=args.processes) as pool:
+        parts = pool.map(client_process, jobs)
+    latencies = [lat for part, _ in parts for lat in part]
+    elapsed = max(e for _, e in parts)
+    return latencies, len(latencies) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client-side sharded Redis scale-out benchmark")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--workload", dest="workloads", choices=WORKLOADS, action="append")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 4,
+                        help="client processes generating load")
+    parser.add_argument("--threads", type=int, default=16, help="threads per client process")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--keys", type=int, default=10000, help="product/order keys sampled")
+    parser.add_argument("--load", action="store_true",
+                        help="reload products/orders for every N; wipes them on all instances, "
+                             "leaving only 1/N on the main one (port 6379)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="loader processes")
+    parser.add_argument("--data-folder", default=DATA_FOLDER)
+    parser.add_argument("--scale", type=float, help="load synthetic data at this scale factor")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="redis_scaleout_metrics.csv")
+    args = parser.parse_args()
+
+    results = []
+    print(f"\nRedis scale-out: {args.processes} client processes x {args.threads} threads\n")
+    print(f"{'shards':>6} {'workload':>12} {'ops/sec':>12} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for n_shards in args.shards:
+        if args.load:
+            reload(n_shards, args)
+        client = ShardedRedis(n_shards)
+        product_ids, product_split = sample_ids(client, "products", args.keys)
+        order_ids, order_split = sample_ids(client, "orders", args.keys)
+        print(f"{n_shards:>6} {'sampled':>12}  products {product_split}, orders {order_split}")
+
+        for workload in args.workloads or WORKLOADS:
+            latencies, tput = run_step(n_shards, workload, product_ids, order_ids, args)
+            s = summarize(latencies)
+            print(f"{n_shards:>6} {workload:>12} {tput:>12.0f} {s['p50']:>8.3f} {s['p99']:>8.3f}")
+
+            label = f"Redis x{n_shards}"
+            results += latency_rows(label, "orders" if workload != "read" else "products",
+                                    workload, latencies)
+            results.append([label, "orders" if workload != "read" else "products",
+                            f"{workload} throughput", None, tput])
+
+    save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from harness.config import REDIS_HOST, REDIS_SHARD_PORTS
+
+# Client-side sharding over N independent local redis-server instances.
+#
+# Keys map to one of 16384 hash slots exactly like Redis Cluster
+# (CRC16/XMODEM of the key, or of its {hash tag}), and slots are split
+# into N contiguous ranges, one per instance. Each instance has its own
+# connection pool. ShardedRedis implements the subset of the redis-py
+# client the loaders and benchmarks use, so it can be passed wherever a
+# redis.Redis is expected (e.g. RedisBackend(client=...)).
+
+SLOTS = 16384
+
+
+def _crc16_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC16 = _crc16_table()
+
+
+def crc16(data):
+    crc = 0
+    for b in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16[((crc >> 8) ^ b) & 0xFF]
+    return crc
+
+
+def key_slot(key):
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    # {tag}: only the tag is hashed, so related keys share a shard
+    start = key.find(b"{")
+    if start != -1:
+        end = key.find(b"}", start + 1)
+        if end > start + 1:
+            key = key[start + 1:end]
+    return crc16(key) % SLOTS
+
+
+class ShardedRedis:
+    def __init__(self, n_shards, ports=REDIS_SHARD_PORTS, host=REDIS_HOST,
+                 max_connections=256, **kwargs):
+        import redis
+
+        if n_shards > len(ports):
+            raise ValueError(f"{n_shards} shards requested, only {len(ports)} ports configured")
+        kwargs.setdefault("decode_responses", True)
+        self.ports = ports[:n_shards]
+        self.shards = [
+            redis.Redis(connection_pool=redis.ConnectionPool(
+                host=host, port=port, max_connections=max_connections, **kwargs))
+            for port in self.ports
+        ]
+
+    def shard_index(self, key):
+        return key_slot(key) * len(self.shards) // SLOTS
+
+    def node(self, key):
+        return self.shards[self.shard_index(key)]
+
+    # ---- single-key commands ----
+    def hgetall(self, key):
+        return self.node(key).hgetall(key)
+
+    def hset(self, key, *args, **kwargs):
+        return self.node(key).hset(key, *args, **kwargs)
+
+    def hincrby(self, key, field, amount=1):
+        return self.node(key).hincrby(key, field, amount)
+
+    def get(self, key):
+        return self.node(key).get(key)
+
+    def set(self, key, value, **kwargs):
+        return self.node(key).set(key, value, **kwargs)
+
+    def memory_usage(self, key, samples=None):
+        return self.node(key).memory_usage(key, samples=samples)
+
+    # ---- multi-key / cluster-wide ----
+    def delete(self, *keys):
+        groups = {}
+        for key in keys:
+            groups.setdefault(self.shard_index(key), []).append(key)
+        return sum(self.shards[i].delete(*group) for i, group in groups.items())
+
+    def scan_iter(self, match=None, count=None):
+        for shard in self.shards:
+            yield from shard.scan_iter(match=match, count=count)
+
+    def dbsize(self):
+        return sum(shard.dbsize() for shard in self.shards)
+
+    def pipeline(self, transaction=False):
+        return ShardedPipeline(self)
+
+
+class ShardedPipeline:
+    # Buffers commands, sends one pipeline per shard (in parallel) and
+    # returns the replies in the original command order.
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def _add(self, name, key, *args, **kwargs):
+        self.commands.append((self.client.shard_index(key), name, key, args, kwargs))
+        return self
+
+    def hgetall(self, key):
+        return self._add("hgetall", key)
+
+    def hset(self, key, *args, **kwargs):
+        return self._add("hset", key, *args, **kwargs)
+
+    def hincrby(self, key, field, amount=1):
+        return self._add("hincrby", key, field, amount)
+
+    def delete(self, key):
+        return self._add("delete", key)
+
+    def execute(self):
+        by_shard = {}
+        for pos, (shard, name, key, args, kwargs) in enumerate(self.commands):
+            by_shard.setdefault(shard, []).append((pos, name, key, args, kwargs))
+        self.commands = []
+
+        def run(item):
+            shard, cmds = item
+            pipe = self.client.shards[shard].pipeline(transaction=False)
+            for _, name, key, args, kwargs in cmds:
+                getattr(pipe, name)(key, *args, **kwargs)
+            return cmds, pipe.execute()
+
+        results = [None] * sum(len(c) for c in by_shard.values())
+        if len(by_shard) == 1:
+            parts = [run(next(iter(by_shard.items())))]
+        else:
+            with ThreadPoolExecutor(max_workers=len(by_shard)) as ex:
+                parts = list(ex.map(run, by_shard.items()))
+        for cmds, replies in parts:
+            for (pos, *_), reply in zip(cmds, replies):
+                results[pos] = reply
+        return results
@@ -0,0 +1,122 @@
+import json
+import requests
+
+from harness.aggregates import AGG_DATASET, maintain_redis
+
+from harness.config import (
+    COUCH_URL, COUCH_USER, COUCH_PASSWORD, REDIS_HOST, REDIS_PORT,
+    MONGO_URI, MONGO_DB, DATASETS,
+)
+
+
+# --------------------------------
+# BULK WRITERS
+# --------------------------------
+# open_sink() returns write(batch) for a list of (key, record) pairs.
+# A failed batch raises, so the caller never checkpoints past it.
+# write() returns (records the server already had, payload bytes);
+# the byte count feeds the batch autotuner. Writers are thread-safe,
+# so several batches can be in flight at once.
+REQUEST_TIMEOUT = 120
+def couchdb_sink(dataset, **options):
+    session = requests.Session()
+    session.auth = (COUCH_USER, COUCH_PASSWORD)
+    url = f"{COUCH_URL}/{dataset}/_bulk_docs"
+
+    def write(batch):
+        docs = [dict(record, _id=key) for key, record in batch]
+        body = json.dumps({"docs": docs})
+        r = session.post(
+            url,
+            headers={"Content-Type": "application/json"},
+            data=body,
+            timeout=REQUEST_TIMEOUT,
+        )
+        if r.status_code not in (200, 201, 202):
+            raise RuntimeError(f"_bulk_docs HTTP {r.status_code}: {r.text[:200]}")
+
+        # _bulk_docs answers 201 even when individual docs fail
+        existing = 0
+        for res in r.json():
+            if "error" not in res:
+                continue
+            if res["error"] == "conflict":
+                # Already written by an earlier, interrupted run
+                existing += 1
+            else:
+                raise RuntimeError(f"doc {res.get('id')}: {res['error']} {res.get('reason')}")
+        return existing, len(body)
+
+    return write
+
+
+def redis_sink(dataset, redis_shards=None, aggregates=False, **options):
+    import redis
+
+    # Keep the analytics counters (harness.aggregates) current while
+    # loading. The updates are idempotent per line, so replayed batches
+    # (resumed shards, split retries) are not counted twice.
+    aggregates = aggregates and dataset == AGG_DATASET
+    if aggregates and redis_shards:
+        raise ValueError("aggregate counters need a single Redis instance")
+
+    if redis_shards:
+        # Spread keys over N local instances (see harness.redis_shards)
+        from harness.redis_shards import ShardedRedis
+
+        r = ShardedRedis(redis_shards, socket_timeout=REQUEST_TIMEOUT)
+    else:
+        r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True,
+                        socket_timeout=REQUEST_TIMEOUT)
+    prefix = DATASETS[dataset][2]
+
+    def write(batch):
+        pipe = r.pipeline(transaction=False)
+        size = 0
+        for key, record in batch:
+            data = {k: str(v) for k, v in record.items() if v is not None}
+            size += sum(len(k) + len(v) for k, v in data.items())
+            pipe.hset(f"{prefix}:{key}", mapping=data)
+            if aggregates:
+                maintain_redis(pipe, key, record)
+        pipe.execute()
+        # HSET is an upsert, so a replayed batch is harmless
+        return 0, size
+
+    return write
+
+
+def mongodb_sink(dataset, **options):
+    import bson
+    import pymongo
+    from pymongo.errors import BulkWriteError
+
+    col = pymongo.MongoClient(MONGO_URI, socketTimeoutMS=REQUEST_TIMEOUT * 1000)[MONGO_DB][dataset]
+
+    def write(batch):
+        docs = [dict(record, _id=key) for key, record in batch]
+        # Estimated from the first document rather than encoding twice
+        size = len(bson.encode(docs[0])) * len(docs) if docs else 0
+        try:
+            col.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            # 11000 = duplicate _id, i.e. already written
+            other = [err for err in errors if err.get("code") != 11000]
+            if other:
+                raise RuntimeError(f"insert_many: {other[0].get('errmsg')}")
+            return len(errors), size
+        return 0, size
+
+    return write
+
+
+SINKS = {
+    "couchdb": couchdb_sink,
+    "mongodb": mongodb_sink,
+    "redis": redis_sink,
+}
+
+
+def open_sink(engine, dataset, **options):
+    return SINKS[engine](dataset, **options)
@@ -0,0 +1,52 @@
+import math
+
+
+# --------------------------------
+# LATENCY SUMMARIES
+# --------------------------------
+def percentile(values, p):
+    # Nearest-rank percentile; values need not be sorted
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies_ms):
+    if not latencies_ms:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(latencies_ms)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+    }
+
+
+# --------------------------------
+# RESULTS
+# --------------------------------
+# Same column layout as the per-engine *_metrics*.csv files, so the
+# harness output can be concatenated with them.
+COLUMNS = ["Database", "Dataset", "Metric", "Latency (ms)", "Throughput (ops/sec)"]
+
+
+def latency_rows(database, dataset, metric, latencies_ms):
+    s = summarize(latencies_ms)
+    return [
+        [database, dataset, f"{metric} latency mean", s["mean"], None],
+        [database, dataset, f"{metric} latency p50", s["p50"], None],
+        [database, dataset, f"{metric} latency p95", s["p95"], None],
+        [database, dataset, f"{metric} latency p99", s["p99"], None],
+    ]
+
+
+def save_results(results, filename):
+    import pandas as pd
+
+    pd.DataFrame(results, columns=COLUMNS).to_csv(filename, index=False)
+    print(f"\nSaved results to {filename}")
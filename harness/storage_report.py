@@ -0,0 +1,140 @@
+import argparse
+import random
+import time
+
+from harness.backends import BACKENDS
+from harness.config import COUCH_URL, DATASETS
+
+# Storage accounting after a load, per dataset and engine:
+#   Redis    MEMORY USAGE on a random sample of keys per prefix,
+#            scaled by the prefix's key count (SCAN)
+#   MongoDB  collStats: size, storageSize, totalIndexSize
+#   CouchDB  db info sizes.active/external/file, before and after
+#            compaction, plus the active size of every design-doc index
+#
+#   python -m harness.storage_report --engine redis --sample 2000
+#
+# bytes/record uses the on-disk (or in-memory for Redis) size; index
+# overhead is index bytes as a fraction of data bytes. Active bytes is
+# CouchDB's live data in the file (sizes.active); file - active is what
+# compaction can reclaim. It is empty for the other engines.
+
+COLUMNS = ["Database", "Dataset", "Stage", "Records", "Data bytes", "Storage bytes",
+           "Active bytes", "Index bytes", "Bytes per record", "Index overhead"]
+
+
+# --------------------------------
+# REDIS
+# --------------------------------
+def redis_footprint(backend, args):
+    rows = []
+    for dataset, (_, _, prefix) in DATASETS.items():
+        keys = list(backend.r.scan_iter(match=f"{prefix}:*", count=5000))
+        if not keys:
+            continue
+        sample = random.Random(args.seed).sample(keys, min(args.sample, len(keys)))
+        sizes = [backend.r.memory_usage(k, samples=0) or 0 for k in sample]
+        per_key = sum(sizes) / len(sizes)
+        total = per_key * len(keys)
+        rows.append(["Redis", dataset, "loaded", len(keys), total, total, None, 0, per_key, 0.0])
+    return rows
+
+
+# --------------------------------
+# MONGODB
+# --------------------------------
+def mongo_footprint(backend, args):
+    rows = []
+    for dataset in DATASETS:
+        stats = backend.db.command("collStats", dataset)
+        count = stats.get("count", 0)
+        if not count:
+            continue
+        data, storage, index = stats["size"], stats["storageSize"], stats["totalIndexSize"]
+        rows.append(["MongoDB", dataset, "loaded", count, data, storage, None, index,
+                     (storage + index) / count, index / storage if storage else None])
+    return rows
+
+
+# --------------------------------
+# COUCHDB
+# --------------------------------
+def couch_index_bytes(session, dataset):
+    r = session.get(f"{COUCH_URL}/{dataset}/_all_docs",
+                    params={"startkey": '"_design/"', "endkey": '"_design0"'})
+    total = 0
+    for row in r.json().get("rows", []):
+        info = session.get(f"{COUCH_URL}/{dataset}/{row['id']}/_info").json()
+        total += info.get("view_index", {}).get("sizes", {}).get("active", 0)
+    return total
+
+
+def couch_row(session, dataset, stage):
+    info = session.get(f"{COUCH_URL}/{dataset}").json()
+    sizes = info["sizes"]
+    count = info["doc_count"]
+    index = couch_index_bytes(session, dataset)
+    return ["CouchDB", dataset, stage, count, sizes["external"], sizes["file"],
+            sizes["active"], index,
+            (sizes["file"] + index) / count if count else None,
+            index / sizes["file"] if sizes["file"] else None]
+
+
+def compact(session, dataset):
+    session.post(f"{COUCH_URL}/{dataset}/_compact",
+                 headers={"Content-Type": "application/json"})
+    while session.get(f"{COUCH_URL}/{dataset}").json().get("compact_running"):
+        time.sleep(1)
+
+
+def couch_footprint(backend, args):
+    rows = []
+    session = backend.session
+    for dataset in DATASETS:
+        if session.get(f"{COUCH_URL}/{dataset}").status_code != 200:
+            continue
+        row = couch_row(session, dataset, "before compaction")
+        rows.append(row)
+        print(f"  {dataset}: active {row[6]} / file {row[5]} bytes")
+        if args.compact:
+            compact(session, dataset)
+            row = couch_row(session, dataset, "after compaction")
+            rows.append(row)
+            print(f"  {dataset} compacted: active {row[6]} / file {row[5]} bytes")
+    return rows
+
+
+FOOTPRINTS = {
+    "redis": redis_footprint,
+    "mongodb": mongo_footprint,
+    "couchdb": couch_footprint,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-dataset storage footprint report")
+    parser.add_argument("--engine", choices=sorted(FOOTPRINTS), action="append",
+                        help="repeatable; defaults to all engines")
+    parser.add_argument("--sample", type=int, default=1000, help="Redis keys sampled per prefix")
+    parser.add_argument("--no-compact", dest="compact", action="store_false",
+                        help="skip CouchDB compaction (report the 'before' sizes only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="storage_footprint.csv")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    rows = []
+    for engine in args.engine or ["mongodb", "couchdb", "redis"]:
+        print(f"Measuring {engine}...")
+        rows += FOOTPRINTS[engine](BACKENDS[engine](), args)
+
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    print()
+    print(df.to_string(index=False))
+    df.to_csv(args.output, index=False)
+    print(f"\nSaved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from harness.backends import BACKENDS
+from harness.config import BENCH_TAG_FIELD, CHECKPOINT_DIR, DATA_FOLDER
+from harness.stats import latency_rows, save_results, summarize
+from harness import telemetry as live
+
+# Runs the engine x dataset x workload x threads matrix from one config:
+#
+#   python -m harness.sweep                          # harness/sweep_config.json
+#   python -m harness.sweep --config my_sweep.json --engine redis --threads 1 10
+#
+# Every cell starts from the same data:
+#   - insert cells create records tagged with the run id, which are
+#     deleted (delete_tagged) before the next cell;
+#   - update / add_to_cart cells mutate one sampled record, which is
+#     snapshotted up front and written back after the cell.
+# Datasets are never reloaded between cells. With "load_missing" an
+# empty dataset is loaded once through harness.load_coordinator, whose
+# checkpoints turn an already completed load into a no-op.
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), "sweep_config.json")
+WORKLOADS = ["read", "scan", "insert", "update", "add_to_cart"]
+MUTATING = {"insert", "update", "add_to_cart"}
+
+
+# --------------------------------
+# CONFIG
+# --------------------------------
+def load_config(args):
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    # Command-line values override the file
+    for name in ("engines", "datasets", "workloads", "duration", "scan_limit", "output"):
+        value = getattr(args, name)
+        if value is not None:
+            config[name] = value
+    if args.threads is not None:
+        config["threads"] = args.threads
+    if args.load_missing:
+        config["load_missing"] = True
+    return config
+
+
+def threads_for(config, engine):
+    threads = config["threads"]
+    return threads[engine] if isinstance(threads, dict) else threads
+
+
+# --------------------------------
+# WORKLOAD OPERATIONS
+# --------------------------------
+def strip_ids(record):
+    return {k: v for k, v in record.items() if k not in ("_id", "_rev")}
+
+
+def make_op(workload, backend, dataset, ctx, cell_id):
+    if workload == "read":
+        return lambda worker, i: backend.get(dataset, ctx["sample_id"])
+    if workload == "scan":
+        return lambda worker, i: backend.scan(dataset, ctx["scan_limit"])
+    if workload == "insert":
+        base = dict(strip_ids(ctx["sample"]), **{BENCH_TAG_FIELD: ctx["run_id"]})
+        return lambda worker, i: backend.insert(
+            dataset, f"{ctx['run_id']}-{cell_id}-{worker}-{i}", base)
+    if workload == "update":
+        return lambda worker, i: backend.incr(dataset, ctx["sample_id"], "bench_update", 1)
+    if workload == "add_to_cart":
+        def add_to_cart(worker, i):
+            backend.get("products", ctx["product_id"])
+            backend.incr("orders", ctx["order_id"], "cart_items", 1)
+        return add_to_cart
+    raise ValueError(f"unknown workload '{workload}'")
+
+
+def run_cell(op, n_threads, duration, telemetry):
+    start = time.time()
+
+    def task(worker):
+        latencies = []
+        errors = 0
+        while time.time() - start < duration:
+            t0 = time.perf_counter()
+            failed = False
+            try:
+                op(worker, len(latencies))
+            except Exception:
+                failed = True
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+            telemetry.record(latencies[-1], failed)
+        return latencies, errors
+
+    with ThreadPoolExecutor(max_workers=n_threads) as ex:
+        parts = list(ex.map(task, range(n_threads)))
+    elapsed = time.time() - start
+
+    latencies = [lat for part, _ in parts for lat in part]
+    return latencies, sum(e for _, e in parts), len(latencies) / elapsed
+
+
+# --------------------------------
+# CLEAN STATE BETWEEN CELLS
+# --------------------------------
+def reset_cell(backend, workload, dataset, ctx):
+    if workload == "insert":
+        removed = backend.delete_tagged(dataset, ctx["run_id"])
+        print(f"    rolled back {removed} inserted records")
+    elif workload == "update":
+        backend.restore(dataset, ctx["sample_id"], ctx["sample"])
+    elif workload == "add_to_cart":
+        backend.restore("orders", ctx["order_id"], ctx["order"])
+
+
+def ensure_loaded(engine, backend, dataset, config):
+    if backend.has_data(dataset):
+        return True
+    if not config.get("load_missing"):
+        print(f"  {dataset} is empty in {backend.name}, skipping "
+              f"(set load_missing to load it)")
+        return False
+    from harness.load_coordinator import run_load
+
+    return run_load(engine, dataset, os.cpu_count() or 4, None,
+                    config.get("data_folder") or DATA_FOLDER, CHECKPOINT_DIR)
+
+
+# --------------------------------
+# MAIN
+# --------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Engine x workload x threads x dataset sweep")
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    parser.add_argument("--engine", dest="engines", choices=sorted(BACKENDS), action="append")
+    parser.add_argument("--dataset", dest="datasets", action="append")
+    parser.add_argument("--workload", dest="workloads", choices=WORKLOADS, action="append")
+    parser.add_argument("--threads", type=int, nargs="+")
+    parser.add_argument("--duration", type=float)
+    parser.add_argument("--scan-limit", type=int)
+    parser.add_argument("--load-missing", action="store_true")
+    parser.add_argument("--output")
+    live.add_arguments(parser)
+    args = parser.parse_args()
+    config = load_config(args)
+    telemetry = live.from_args(args).start()
+
+    run_id = f"sweep-{int(time.time())}"
+    print(f"\nSweep {run_id}: engines={config['engines']} datasets={config['datasets']} "
+          f"workloads={config['workloads']}\n")
+
+    results = []
+    cell = 0
+    for engine in config["engines"]:
+        backend = BACKENDS[engine]()
+        print(f"{backend.name}")
+        if hasattr(backend, "conflicts"):
+            telemetry.add_count_source("conflicts", lambda b=backend: b.conflicts)
+
+        for dataset in config["datasets"]:
+            if not ensure_loaded(engine, backend, dataset, config):
+                continue
+            ctx = {"run_id": run_id, "scan_limit": config["scan_limit"]}
+            ctx["sample_id"] = backend.sample_ids(dataset, 1)[0]
+            ctx["sample"] = backend.get(dataset, ctx["sample_id"])
+
+            for workload in config["workloads"]:
+                # add_to_cart always touches products + orders, so run it once
+                if workload == "add_to_cart":
+                    if dataset != "orders" or not backend.has_data("products"):
+                        continue
+                    ctx["product_id"] = backend.sample_ids("products", 1)[0]
+                    ctx["order_id"] = ctx["sample_id"]
+                    ctx["order"] = ctx["sample"]
+
+                for n_threads in threads_for(config, engine):
+                    cell += 1
+                    op = make_op(workload, backend, dataset, ctx, cell)
+                    telemetry.set_phase(f"{engine}/{dataset}/{workload}/{n_threads}")
+                    lat, errors, tput = run_cell(op, n_threads, config["duration"], telemetry)
+                    s = summarize(lat)
+                    print(f"  {dataset:<13} {workload:<12} {n_threads:>4} threads: "
+                          f"{tput:10.1f} ops/sec, p50 {s['p50'] or 0:.3f} ms, "
+                          f"p99 {s['p99'] or 0:.3f} ms, {errors} errors")
+
+                    label = f"{workload} ({n_threads} threads)"
+                    results += latency_rows(backend.name, dataset, label, lat)
+                    results += [
+                        [backend.name, dataset, f"{label} throughput", None, tput],
+                        [backend.name, dataset, f"{label} errors", errors, None],
+                    ]
+                    if workload in MUTATING:
+                        reset_cell(backend, workload, dataset, ctx)
+        print()
+
+    telemetry.stop()
+    save_results(results, config["output"])
+
+
+if __name__ == "__main__":
+    main()
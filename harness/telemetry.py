@@ -0,0 +1,218 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from harness.stats import summarize
+
+# Per-second time series while a benchmark runs:
+#
+#   telemetry = Telemetry("run.jsonl", prometheus_port=9108)
+#   telemetry.start()
+#   telemetry.set_phase("redis/orders/update/50")
+#   telemetry.record(latency_ms, error=False)      # from any thread
+#   telemetry.stop()
+#
+# Every interval one JSON line is appended with the window's ops/sec,
+# errors, conflicts and latency percentiles -- also when nothing
+# completed, so a full stall shows up as ops_per_sec 0 rather than a
+# gap. Only the partial windows flushed by set_phase()/stop() are
+# dropped when empty. With prometheus_port set,
+# the latest window and running totals are served at
+# http://127.0.0.1:<port>/metrics in the Prometheus text format.
+#
+# Conflicts are polled from count sources: callables returning a
+# cumulative count (e.g. lambda: couch_backend.conflicts), reported as
+# the per-window delta.
+
+
+def add_arguments(parser):
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="write per-second metrics as JSON lines to PATH")
+    parser.add_argument("--prometheus-port", type=int,
+                        help="serve live metrics on 127.0.0.1:PORT/metrics")
+
+
+def from_args(args):
+    if not args.telemetry and not args.prometheus_port:
+        return NullTelemetry()
+    return Telemetry(args.telemetry, args.prometheus_port)
+
+
+class NullTelemetry:
+    # Same interface, does nothing; keeps call sites free of ifs
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def set_phase(self, phase):
+        pass
+
+    def add_count_source(self, name, func):
+        pass
+
+    def record(self, latency_ms, error=False):
+        pass
+
+
+class Telemetry:
+    def __init__(self, path=None, prometheus_port=None, interval=1.0):
+        self.path = path
+        self.prometheus_port = prometheus_port
+        self.interval = interval
+        self.phase = ""
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._errors = 0
+        self._sources = {}
+        self._last_counts = {}
+        self._totals = {"ops": 0, "errors": 0}
+        self._latest = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        self._file = None
+        self._start = None
+        self._window_start = None
+        self._emit_lock = threading.Lock()
+
+    # ---- recording (hot path) ----
+    def record(self, latency_ms, error=False):
+        with self._lock:
+            self._latencies.append(latency_ms)
+            if error:
+                self._errors += 1
+
+    def set_phase(self, phase):
+        # Flush what the previous phase did so windows never mix phases
+        if self._thread is not None:
+            self._emit()
+        self.phase = phase
+
+    def add_count_source(self, name, func):
+        self._sources[name] = func
+        self._last_counts[name] = func()
+
+    # ---- lifecycle ----
+    def start(self):
+        self._start = self._window_start = time.time()
+        if self.path:
+            self._file = open(self.path, "a", encoding="utf-8")
+        if self.prometheus_port:
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.prometheus_port),
+                                               self._handler())
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            print(f"Prometheus metrics on http://127.0.0.1:{self.prometheus_port}/metrics")
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._emit()
+        if self._server is not None:
+            self._server.shutdown()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- windows ----
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._emit(skip_empty=False)
+
+    def _emit(self, skip_empty=True):
+        # set_phase() and the background loop can both flush a window
+        with self._emit_lock:
+            self._emit_window(skip_empty)
+
+    def _emit_window(self, skip_empty):
+        now = time.time()
+        with self._lock:
+            latencies, self._latencies = self._latencies, []
+            errors, self._errors = self._errors, 0
+            window = now - (self._window_start or now)
+            self._window_start = now
+
+        counts = {}
+        for name, func in self._sources.items():
+            current = func()
+            counts[name] = current - self._last_counts[name]
+            self._last_counts[name] = current
+
+        if skip_empty and not latencies and not errors and not any(counts.values()):
+            return
+        s = summarize(latencies)
+        point = {
+            "ts": round(now, 3),
+            "elapsed": round(now - (self._start or now), 3),
+            "phase": self.phase,
+            "ops": len(latencies),
+            "ops_per_sec": len(latencies) / window if window > 0 else None,
+            "errors": errors,
+            **counts,
+            "p50_ms": s["p50"], "p95_ms": s["p95"], "p99_ms": s["p99"], "max_ms": s["max"],
+        }
+        self._totals["ops"] += len(latencies)
+        self._totals["errors"] += errors
+        for name, n in counts.items():
+            self._totals[name] = self._totals.get(name, 0) + n
+        self._latest = point
+
+        if self._file is not None:
+            self._file.write(json.dumps(point) + "\n")
+            self._file.flush()
+
+    # ---- prometheus ----
+    def _exposition(self):
+        lines = []
+        point = self._latest
+        if point is not None:
+            phase = point["phase"].replace('"', "'")
+            gauges = {
+                "bench_ops_per_second": point["ops_per_sec"],
+                "bench_window_errors": point["errors"],
+                "bench_latency_p50_ms": point["p50_ms"],
+                "bench_latency_p95_ms": point["p95_ms"],
+                "bench_latency_p99_ms": point["p99_ms"],
+                "bench_latency_max_ms": point["max_ms"],
+            }
+            for name, value in gauges.items():
+                if value is not None:
+                    lines.append(f"# TYPE {name} gauge")
+                    lines.append(f'{name}{{phase="{phase}"}} {value}')
+        for name, value in self._totals.items():
+            metric = f"bench_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _handler(self):
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry._exposition().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # keep the benchmark output clean
+
+        return Handler
@@ -2,6 +2,7 @@ import time
 import psutil
 import pymongo
 import pandas as pd
+from bson.raw_bson import RawBSONDocument
 from statistics import mean
 from concurrent.futures import ThreadPoolExecutor
 
@@ -20,6 +21,16 @@ COLLECTIONS = {
 
 THREADS = [10, 50, 100, 200]
 
+# Same collections, but documents stay undecoded BSON bytes
+# (RawBSONDocument) instead of being built into dicts
+raw_client = pymongo.MongoClient("mongodb://localhost:27017/",
+                                 document_class=RawBSONDocument)
+raw_db = raw_client["ecommerce_db"]
+DECODE_MODES = {
+    "decoded": db,
+    "raw": raw_db,
+}
+
 # --------------------------------
 # GENERIC MEASUREMENT
 # --------------------------------
@@ -137,6 +148,28 @@ for name, col in COLLECTIONS.items():
 
     print(f"  Completed CRUD + scalability for {name}")
 
+# --------------------------------
+# DECODED VS RAW DOCUMENTS
+# --------------------------------
+print("\nRunning decode-mode comparison...\n")
+
+for name in COLLECTIONS:
+    for mode, mode_db in DECODE_MODES.items():
+        col = mode_db[name]
+        results.append(
+            ["MongoDB", name, f"Read throughput ({mode})", None,
+             throughput(lambda: point_read(col))]
+        )
+        results.append(
+            ["MongoDB", name, f"Scan latency ({mode})",
+             measure(lambda: scan_read(col)) * 1000, None]
+        )
+        results.append(
+            ["MongoDB", name, f"Scan throughput ({mode})", None,
+             throughput(lambda: scan_read(col))]
+        )
+    print(f"  Completed decode modes for {name}")
+
 # --------------------------------
 # ADD-TO-CART METRICS (GLOBAL)
 # --------------------------------
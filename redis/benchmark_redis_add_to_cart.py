@@ -11,6 +11,13 @@ r = redis.Redis(
     decode_responses=True
 )
 
+# Same server, replies left as bytes (no UTF-8 decoding)
+r_raw = redis.Redis(
+    host="localhost",
+    port=6379,
+    decode_responses=False
+)
+
 # -------------------------------
 # PREPARE SAMPLE KEYS
 # -------------------------------
@@ -30,32 +37,32 @@ print("Order:", order_key)
 # -------------------------------
 # ADD-TO-CART OPERATION
 # -------------------------------
-def add_to_cart():
+def add_to_cart(client=r):
     # Read product (simulate lookup)
-    r.hgetall(product_key)
+    client.hgetall(product_key)
 
     # Update order cart
-    r.hincrby(order_key, "cart_items", 1)
+    client.hincrby(order_key, "cart_items", 1)
 
 # -------------------------------
 # LATENCY MEASUREMENT
 # -------------------------------
-def measure_latency(runs=1000):
+def measure_latency(runs=1000, client=r):
     times = []
     for _ in range(runs):
         start = time.time()
-        add_to_cart()
+        add_to_cart(client)
         times.append((time.time() - start) * 1000)
     return mean(times)
 
 # -------------------------------
 # THROUGHPUT MEASUREMENT
 # -------------------------------
-def measure_throughput(duration=5):
+def measure_throughput(duration=5, client=r):
     count = 0
     start = time.time()
     while time.time() - start < duration:
-        add_to_cart()
+        add_to_cart(client)
         count += 1
     return count / duration
 
@@ -70,6 +77,12 @@ throughput_ops = measure_throughput()
 print(f"Add-to-Cart Latency (ms): {latency_ms:.4f}")
 print(f"Add-to-Cart Throughput (ops/sec): {throughput_ops:.2f}")
 
+raw_latency_ms = measure_latency(client=r_raw)
+raw_throughput_ops = measure_throughput(client=r_raw)
+
+print(f"Add-to-Cart Latency, raw replies (ms): {raw_latency_ms:.4f}")
+print(f"Add-to-Cart Throughput, raw replies (ops/sec): {raw_throughput_ops:.2f}")
+
 # -------------------------------
 # SAVE RESULTS
 # -------------------------------
@@ -87,6 +100,18 @@ df = pd.DataFrame([{
     "Metric": "Add-to-Cart throughput",
     "Latency (ms)": None,
     "Throughput (ops/sec)": throughput_ops
+}, {
+    "Database": "Redis",
+    "Dataset": "orders",
+    "Metric": "Add-to-Cart latency (raw)",
+    "Latency (ms)": raw_latency_ms,
+    "Throughput (ops/sec)": None
+}, {
+    "Database": "Redis",
+    "Dataset": "orders",
+    "Metric": "Add-to-Cart throughput (raw)",
+    "Latency (ms)": None,
+    "Throughput (ops/sec)": raw_throughput_ops
 }])
 
 df.to_csv("redis_add_to_cart_metrics.csv", index=False)
@@ -0,0 +1,218 @@
+import redis
+import time
+import pandas as pd
+from statistics import mean, median
+
+# -------------------------------
+# REDIS CONNECTION (LOCAL SERVER ONLY)
+# -------------------------------
+# This script rewrites the server's persistence settings with
+# CONFIG SET and restores them at the end. Point it at a local
+# benchmark instance, never a shared one.
+r = redis.Redis(
+    host="localhost",
+    port=6379,
+    decode_responses=True
+)
+
+DURATION = 10             # seconds per workload per mode
+BUCKET_MS = 100           # timeline resolution
+STALL_FACTOR = 20         # op slower than 20x the median counts as a stall
+BACKGROUND_AT = 0.5       # trigger BGSAVE / BGREWRITEAOF halfway through
+CLONE_PREFIX = "bench:durability"
+
+MODES = {
+    "none": {"appendonly": "no", "save": ""},
+    # Aggressive snapshotting so forks happen inside a 10s run
+    "rdb": {"appendonly": "no", "save": "5 100"},
+    "aof-everysec": {"appendonly": "yes", "appendfsync": "everysec", "save": ""},
+    "aof-always": {"appendonly": "yes", "appendfsync": "always", "save": ""},
+}
+
+CONFIG_KEYS = ["appendonly", "appendfsync", "save", "latency-monitor-threshold"]
+
+# -------------------------------
+# SAMPLE KEYS
+# -------------------------------
+product_keys = list(r.scan_iter(match="product:*", count=1000))[:1]
+order_keys = list(r.scan_iter(match="order:*", count=1000))[:1]
+
+if not product_keys or not order_keys:
+    raise RuntimeError("Products or Orders not found in Redis")
+
+product_key = product_keys[0]
+order_key = order_keys[0]
+product_data = r.hgetall(product_key)
+
+# -------------------------------
+# WORKLOADS
+# -------------------------------
+counter = {"n": 0}
+
+def insert_clone():
+    counter["n"] += 1
+    r.hset(f"{CLONE_PREFIX}:{counter['n']}", mapping=product_data)
+
+def update_doc():
+    r.hincrby(order_key, "__bench_update", 1)
+
+def add_to_cart():
+    r.hgetall(product_key)
+    r.hincrby(order_key, "cart_items", 1)
+
+# workload -> (function, dataset it writes to)
+WORKLOADS = {
+    "Insert": (insert_clone, "products"),
+    "Update": (update_doc, "orders"),
+    "Add-to-Cart": (add_to_cart, "orders"),
+}
+
+# -------------------------------
+# PERSISTENCE CONTROL
+# -------------------------------
+def wait_for_background():
+    # Enabling AOF starts a rewrite; let it finish before measuring
+    while True:
+        info = r.info("persistence")
+        busy = (info.get("rdb_bgsave_in_progress") or info.get("aof_rewrite_in_progress")
+                or info.get("aof_rewrite_scheduled"))
+        if not busy:
+            return
+        time.sleep(0.1)
+
+def apply_mode(settings):
+    for name, value in settings.items():
+        r.config_set(name, value)
+    wait_for_background()
+
+def trigger_background(mode):
+    try:
+        if mode == "rdb":
+            r.bgsave()
+        elif mode.startswith("aof"):
+            r.bgrewriteaof()
+    except redis.ResponseError:
+        pass  # one already running
+
+def delete_clones():
+    keys = list(r.scan_iter(match=f"{CLONE_PREFIX}:*", count=1000))
+    for i in range(0, len(keys), 1000):
+        r.delete(*keys[i:i + 1000])
+
+# -------------------------------
+# TIMED RUN WITH LATENCY TIMELINE
+# -------------------------------
+def run_timeline(func, mode):
+    samples = []
+    triggered = False
+    start = time.time()
+    while True:
+        now = time.time()
+        if now - start >= DURATION:
+            break
+        if not triggered and now - start >= DURATION * BACKGROUND_AT:
+            trigger_background(mode)
+            triggered = True
+        t0 = time.perf_counter()
+        func()
+        samples.append((now - start, (time.perf_counter() - t0) * 1000))
+    return start, samples
+
+def bucketize(samples):
+    buckets = {}
+    for t, lat in samples:
+        b = int(t * 1000 // BUCKET_MS)
+        buckets.setdefault(b, []).append(lat)
+    return [(b * BUCKET_MS / 1000, len(v), mean(v), max(v)) for b, v in sorted(buckets.items())]
+
+def server_events(start):
+    # LATENCY HISTORY entries are (unix time, latency ms) per event type
+    events = []
+    for event in ("fork", "aof-fsync-always", "aof-write", "aof-rewrite-diff-write"):
+        for ts, ms in r.execute_command("LATENCY", "HISTORY", event):
+            if ts >= int(start):
+                events.append((event, ts - start, ms))
+    return events
+
+# -------------------------------
+# RUN BENCHMARKS
+# -------------------------------
+original = {}
+for name in CONFIG_KEYS:
+    original.update(r.config_get(name))
+
+results = []
+timeline = []
+events = []
+
+print("\nRunning Redis Durability Benchmarks...\n")
+
+try:
+    r.config_set("latency-monitor-threshold", 1)
+
+    for mode, settings in MODES.items():
+        print(f"Mode: {mode}")
+        apply_mode(settings)
+
+        for workload, (func, dataset) in WORKLOADS.items():
+            r.execute_command("LATENCY", "RESET")
+            forks_before = r.info("stats")["total_forks"]
+            start, samples = run_timeline(func, mode)
+            wait_for_background()
+
+            lats = [lat for _, lat in samples]
+            stall_limit = median(lats) * STALL_FACTOR
+            stalls = [lat for lat in lats if lat > stall_limit]
+            # Fork count from total_forks: LATENCY HISTORY keeps one sample
+            # per second and only forks over the threshold, so it is used
+            # for the durations of this run's forks only
+            n_forks = r.info("stats")["total_forks"] - forks_before
+            run_events = server_events(start)
+            fork_times = [ms for event, _, ms in run_events if event == "fork"]
+            fork_ms = max(fork_times) if fork_times else 0
+
+            results.extend([
+                [f"Redis ({mode})", dataset, f"{workload} latency", mean(lats), None],
+                [f"Redis ({mode})", dataset, f"{workload} max latency", max(lats), None],
+                [f"Redis ({mode})", dataset, f"{workload} throughput", None, len(lats) / DURATION],
+                [f"Redis ({mode})", dataset, f"{workload} stalls (> {STALL_FACTOR}x median)", len(stalls), None],
+                [f"Redis ({mode})", dataset, f"{workload} forks", n_forks, None],
+                [f"Redis ({mode})", dataset, f"{workload} max fork (ms)", fork_ms, None],
+            ])
+            for t, count, avg, worst in bucketize(samples):
+                timeline.append([mode, workload, t, count, avg, worst])
+            for event, t, ms in run_events:
+                events.append([mode, workload, event, t, ms])
+
+            print(f"  {workload}: {len(lats) / DURATION:.0f} ops/sec, "
+                  f"max {max(lats):.2f} ms, {len(stalls)} stalls")
+
+        delete_clones()
+finally:
+    # appendonly last, so restoring "no" doesn't race a pending rewrite
+    for name in ["save", "appendfsync", "latency-monitor-threshold", "appendonly"]:
+        if name in original:
+            r.config_set(name, original[name])
+    delete_clones()
+
+# -------------------------------
+# SAVE RESULTS
+# -------------------------------
+pd.DataFrame(
+    results,
+    columns=["Database", "Dataset", "Metric", "Latency (ms)", "Throughput (ops/sec)"]
+).to_csv("redis_durability_metrics.csv", index=False)
+
+pd.DataFrame(
+    timeline,
+    columns=["Mode", "Workload", "Time (s)", "Ops", "Mean latency (ms)", "Max latency (ms)"]
+).to_csv("redis_durability_timeline.csv", index=False)
+
+pd.DataFrame(
+    events,
+    columns=["Mode", "Workload", "Event", "Time (s)", "Latency (ms)"]
+).to_csv("redis_durability_events.csv", index=False)
+
+print("\nSaved results to redis_durability_metrics.csv, "
+      "redis_durability_timeline.csv and redis_durability_events.csv")
+print("Redis durability benchmark completed.")
@@ -14,6 +14,17 @@ r = redis.Redis(
     decode_responses=True
 )
 
+# Same server, replies left as bytes (no UTF-8 decoding)
+r_raw = redis.Redis(
+    host="localhost",
+    port=6379,
+    decode_responses=False
+)
+DECODE_MODES = {
+    "decoded": r,
+    "raw": r_raw,
+}
+
 DATASETS = {
     "products": "product:*",
     "orders": "order:*",
@@ -53,12 +64,12 @@ def get_sample_key(pattern):
     keys = list(r.scan_iter(match=pattern, count=1))
     return keys[0] if keys else None
 
-def point_read(key):
-    r.hgetall(key)
+def point_read(key, client=r):
+    client.hgetall(key)
 
-def scan_read(pattern):
-    for _, k in zip(range(SCAN_LIMIT), r.scan_iter(match=pattern)):
-        r.hgetall(k)
+def scan_read(pattern, client=r):
+    for _, k in zip(range(SCAN_LIMIT), client.scan_iter(match=pattern)):
+        client.hgetall(k)
 
 def insert_clone(key, prefix):
     data = r.hgetall(key)
@@ -135,6 +146,17 @@ for dataset, pattern in DATASETS.items():
             ["Redis", dataset, f"Throughput ({t} threads)", None, tput]
         )
 
+    # Decoded vs raw replies
+    for mode, client in DECODE_MODES.items():
+        results.append(
+            ["Redis", dataset, f"Read throughput ({mode})", None,
+             measure_throughput(lambda: point_read(sample_key, client))]
+        )
+        results.append(
+            ["Redis", dataset, f"Scan latency ({mode})",
+             measure_latency(lambda: scan_read(pattern, client)), None]
+        )
+
     print(f"  Completed CRUD + scalability for {dataset}")
 
 # -------------------------------
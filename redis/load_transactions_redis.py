@@ -1,6 +1,12 @@
 import redis
 import pandas as pd
 import os
+import sys
+import time
+
+# Shared batch autotuner lives in harness/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from harness.autotune import BatchTuner
 
 # -------------------------------
 # REDIS CONNECTION
@@ -34,20 +40,39 @@ df = pd.read_csv(
 print(f"Loaded {len(df)} transaction records")
 
 # -------------------------------
-# INSERT INTO REDIS
+# INSERT INTO REDIS (PIPELINED, AUTOTUNED BATCH SIZE)
 # -------------------------------
+tuner = BatchTuner(label="transactions", max_inflight=1)
+pipe = r.pipeline(transaction=False)
+batch_bytes = 0
 inserted = 0
 
+def flush():
+    global batch_bytes
+    n = len(pipe)
+    start = time.time()
+    pipe.execute()
+    tuner.observe(n, batch_bytes, time.time() - start)
+    batch_bytes = 0
+
 for idx, row in df.iterrows():
     # Use index as unique transaction ID
     txn_id = row.get("InvoiceNo", idx)
     key = f"transaction:{txn_id}"
 
     data = {k: str(v) for k, v in row.items() if pd.notna(v)}
-    r.hset(key, mapping=data)
+    pipe.hset(key, mapping=data)
+    batch_bytes += sum(len(k) + len(v) for k, v in data.items())
     inserted += 1
 
+    if len(pipe) >= tuner.batch_size:
+        flush()
+
+if len(pipe):
+    flush()
+
 print(f"Inserted {inserted} transactions into Redis")
+print(f"Batch settings: {tuner.summary()}")
 
 # -------------------------------
 # VERIFICATION